@@ -280,22 +280,24 @@ class DeleteMultipleTopicsCommand(BaseCommand):
         # Now, perform the deletions for the top-level selected items
         # DataManager's delete_topic will handle cascading.
         deleted_count = 0
-        for topic_id in self.top_level_topic_ids:
-            # Check if topic still exists (it might have been deleted as a child of another selected topic)
-            # A simple check: is it still in our _deleted_topics_data list by ID?
-            # More accurately, the DataManager.delete_topic will handle non-existent topics gracefully.
-            if any(t['id'] == topic_id for t in self._deleted_topics_data): # Check if it was part of the collected data
-                if self.data_manager.delete_topic(topic_id):
-                    deleted_count +=1
+        # One data_changed_bulk for the whole selection instead of signals per deleted topic
+        with self.data_manager.bulk():
+            for topic_id in self.top_level_topic_ids:
+                # Check if topic still exists (it might have been deleted as a child of another selected topic)
+                # A simple check: is it still in our _deleted_topics_data list by ID?
+                # More accurately, the DataManager.delete_topic will handle non-existent topics gracefully.
+                if any(t['id'] == topic_id for t in self._deleted_topics_data): # Check if it was part of the collected data
+                    if self.data_manager.delete_topic(topic_id):
+                        deleted_count +=1
+                    else:
+                        # If a top-level delete fails, we have a problem.
+                        # The _deleted_topics_data might be partially relevant.
+                        # For now, log and continue, but this indicates an issue.
+                        logger.error(f"Failed to delete topic {topic_id} during multi-delete operation.")
+                        # Potentially raise an error or handle partial success/failure.
+                        # For simplicity, we assume DM's delete_topic is robust.
                 else:
-                    # If a top-level delete fails, we have a problem.
-                    # The _deleted_topics_data might be partially relevant.
-                    # For now, log and continue, but this indicates an issue.
-                    logger.error(f"Failed to delete topic {topic_id} during multi-delete operation.")
-                    # Potentially raise an error or handle partial success/failure.
-                    # For simplicity, we assume DM's delete_topic is robust.
-            else:
-                logger.info(f"Topic {topic_id} was likely deleted as a descendant of another selected topic. Skipping explicit delete.")
+                    logger.info(f"Topic {topic_id} was likely deleted as a descendant of another selected topic. Skipping explicit delete.")
 
 
         if not self._deleted_topics_data: # No topics were actually processed for deletion
@@ -317,28 +319,29 @@ class DeleteMultipleTopicsCommand(BaseCommand):
         # Restore topics. The order matters: parents must be restored before children.
         # The _deleted_topics_data should be in pre-order (parent before children).
         restored_count = 0
-        for topic_data in self._deleted_topics_data:
-            # Ensure all necessary fields are present from get_topic_and_all_descendants_details
-            # 'content' was added to topic_data in that method.
-            # 'display_order' should also be there.
-            restored_id = self.data_manager.create_topic(
-                topic_id=topic_data['id'],
-                parent_id=topic_data.get('parent_id'), # Use .get for safety
-                custom_title=topic_data['title'],
-                text_content=topic_data.get('content', ''), # Ensure content exists
-                text_file_uuid=topic_data['text_file_uuid'],
-                created_at=topic_data['created_at'],
-                updated_at=topic_data['updated_at'],
-                display_order=topic_data.get('display_order') # Ensure display_order is handled
-            )
-            if restored_id:
-                restored_count += 1
-            else:
-                logger.error(f"Failed to restore topic {topic_data['id']} during undo.")
-                # This is problematic. The undo is partial.
+        with self.data_manager.bulk(): # Restored topics reach the tree in one refresh
+            for topic_data in self._deleted_topics_data:
+                # Ensure all necessary fields are present from get_topic_and_all_descendants_details
+                # 'content' was added to topic_data in that method.
+                # 'display_order' should also be there.
+                restored_id = self.data_manager.create_topic(
+                    topic_id=topic_data['id'],
+                    parent_id=topic_data.get('parent_id'), # Use .get for safety
+                    custom_title=topic_data['title'],
+                    text_content=topic_data.get('content', ''), # Ensure content exists
+                    text_file_uuid=topic_data['text_file_uuid'],
+                    created_at=topic_data['created_at'],
+                    updated_at=topic_data['updated_at'],
+                    display_order=topic_data.get('display_order') # Ensure display_order is handled
+                )
+                if restored_id:
+                    restored_count += 1
+                else:
+                    logger.error(f"Failed to restore topic {topic_data['id']} during undo.")
+                    # This is problematic. The undo is partial.
         
         logger.info(f"DeleteMultipleTopicsCommand: undo completed. {restored_count}/{len(self._deleted_topics_data)} topics attempted to restore.")
-        # UI updates will be handled by listeners to DataManager.topic_created signal
+        # UI updates come from the single data_changed_bulk emitted when bulk() exits
 
     @property
     def description(self) -> str:
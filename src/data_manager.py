@@ -4,6 +4,9 @@ import os
 import datetime as dt
 import glob
 import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from PyQt6.QtCore import QObject, pyqtSignal
 
 # Get a logger for this module
@@ -12,6 +15,7 @@ logger = logging.getLogger(__name__)
 # Module-level constants
 MIGRATIONS_DIR = "migrations"  # Directory to store SQL migration files relative to app root
 INITIAL_TITLE_LENGTH = 70
+DETAILS_CACHE_SIZE = 256 # Topics whose get_topic_details() rows are kept in memory
 DB_FILENAME = "iromo.sqlite"
 TEXT_FILES_SUBDIR = "text_files"
 
@@ -101,6 +105,51 @@ class DataManager(QObject):
             # Add more default shortcuts here as actions are defined
         }
 
+        # topic_id -> get_topic_details() row, most recently used last. Entries are dropped
+        # by every method that commits a change to the topic's row.
+        self._details_cache = OrderedDict()
+        # Saves run on worker threads, so the cache is only touched with this lock held.
+        # _details_generation counts invalidations; a lookup that raced one doesn't cache its row.
+        self._details_cache_lock = threading.Lock()
+        self._details_generation = 0
+
+        # Nesting depth of bulk() blocks, and whether a change was held back inside them
+        self._bulk_depth = 0
+        self._bulk_changed = False
+
+    @contextmanager
+    def bulk(self):
+        """
+        Groups many mutations, e.g. a multi-topic delete or its undo. Inside the block the
+        per-topic/extraction change signals (and data_changed_bulk) are held back; when the
+        outermost block exits, a single data_changed_bulk is emitted if anything changed.
+        """
+        self._bulk_depth += 1
+        try:
+            yield self
+        finally:
+            self._bulk_depth -= 1
+            if not self._bulk_depth and self._bulk_changed:
+                self._bulk_changed = False
+                self.data_changed_bulk.emit()
+
+    def _emit_change(self, signal, *args):
+        """Emits a change signal, or records it for the data_changed_bulk of an enclosing bulk()."""
+        if self._bulk_depth:
+            self._bulk_changed = True
+        else:
+            signal.emit(*args)
+
+    def _forget_details(self, topic_ids=None):
+        """Drops the cached get_topic_details() rows of topic_ids, or every row if topic_ids is None."""
+        with self._details_cache_lock:
+            self._details_generation += 1
+            if topic_ids is None:
+                self._details_cache.clear()
+            else:
+                for topic_id in topic_ids:
+                    self._details_cache.pop(topic_id, None)
+
     def _get_db_connection(self):
         """Establishes and returns a connection to the SQLite database for the collection."""
         conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
@@ -231,8 +280,9 @@ class DataManager(QObject):
             """, (final_topic_id, parent_id, title, final_text_file_uuid, final_created_at, final_updated_at, final_display_order))
             
             conn.commit()
+            self._forget_details([final_topic_id]) # A restore reuses the id
             logger.info(f"Topic '{title}' (ID: {final_topic_id}) created/restored successfully in collection {self.collection_base_path}.")
-            self.topic_created.emit(final_topic_id, parent_id, title, text_content) # Consider if this signal is appropriate for restore
+            self._emit_change(self.topic_created, final_topic_id, parent_id, title, text_content) # Consider if this signal is appropriate for restore
             return final_topic_id
         except Exception as e:
             conn.rollback()
@@ -307,6 +357,7 @@ class DataManager(QObject):
             
             cursor.execute("UPDATE topics SET updated_at = ? WHERE id = ?", (now, topic_id))
             conn.commit()
+            self._forget_details([topic_id])
             logger.info(f"Content for topic '{topic_id}' in collection {self.collection_base_path} saved successfully.")
             self.topic_content_saved.emit(topic_id)
             return True
@@ -337,8 +388,9 @@ class DataManager(QObject):
                 conn.close()
                 return False
             conn.commit()
+            self._forget_details([topic_id])
             logger.info(f"Title for topic '{topic_id}' in {self.collection_base_path} updated to '{new_title}'.")
-            self.topic_title_changed.emit(topic_id, new_title)
+            self._emit_change(self.topic_title_changed, topic_id, new_title)
             return True
         except Exception as e:
             conn.rollback()
@@ -368,7 +420,15 @@ class DataManager(QObject):
         """
         Retrieves all details for a specific topic.
         Returns a dictionary of the topic's data, or None if not found.
+        Rows are served from an in-memory cache after the first lookup; callers get a copy.
         """
+        with self._details_cache_lock:
+            cached = self._details_cache.get(topic_id)
+            if cached is not None:
+                self._details_cache.move_to_end(topic_id)
+                return dict(cached)
+            generation = self._details_generation
+
         conn = self._get_db_connection()
         cursor = conn.cursor()
         try:
@@ -378,7 +438,15 @@ class DataManager(QObject):
                 WHERE id = ?
             """, (topic_id,))
             row = cursor.fetchone()
-            return dict(row) if row else None
+            if not row:
+                return None # Not cached: the topic may still be created (or restored)
+            details = dict(row)
+            with self._details_cache_lock:
+                if generation == self._details_generation: # Else the row may predate a change
+                    self._details_cache[topic_id] = details
+                    if len(self._details_cache) > DETAILS_CACHE_SIZE:
+                        self._details_cache.popitem(last=False)
+            return dict(details)
         except sqlite3.Error as e:
             logger.error(f"Error fetching details for topic {topic_id} from {self.db_path}: {e}")
             return None
@@ -414,8 +482,9 @@ class DataManager(QObject):
             cursor.execute("UPDATE topics SET updated_at = ? WHERE id = ?", (dt.datetime.now(), parent_topic_id))
 
             conn.commit()
+            self._forget_details([parent_topic_id])
             logger.info(f"Extraction from '{parent_topic_id}' to '{child_topic_id}' (ID: {extraction_id}) created successfully in {self.collection_base_path}.")
-            self.extraction_created.emit(extraction_id, parent_topic_id, child_topic_id, start_char, end_char)
+            self._emit_change(self.extraction_created, extraction_id, parent_topic_id, child_topic_id, start_char, end_char)
             return extraction_id
         except sqlite3.IntegrityError as e:
             conn.rollback()
@@ -535,13 +604,14 @@ class DataManager(QObject):
 
             all_deleted_topic_infos.extend(deleted_infos_list)
             conn.commit()
+            self._forget_details([deleted_id for deleted_id, _old_parent_id in all_deleted_topic_infos])
             logger.info(f"Successfully deleted topic {topic_id} and its descendants. Transaction committed.")
 
             # Emit signals after successful commit
             for deleted_id, old_parent_id in all_deleted_topic_infos:
-                self.topic_deleted.emit(deleted_id, old_parent_id)
+                self._emit_change(self.topic_deleted, deleted_id, old_parent_id)
             if all_deleted_topic_infos: # If anything was actually deleted
-                 self.data_changed_bulk.emit() # A more general signal indicating significant change
+                 self._emit_change(self.data_changed_bulk) # A more general signal indicating significant change
 
             return True
         except Exception as e:
@@ -579,7 +649,7 @@ class DataManager(QObject):
             conn.commit()
             logger.info(f"Extraction '{extraction_id}' deleted successfully from {self.collection_base_path}.")
             if parent_topic_id: # Only emit if we found the parent
-                self.extraction_deleted.emit(extraction_id, parent_topic_id)
+                self._emit_change(self.extraction_deleted, extraction_id, parent_topic_id)
             return True
         except Exception as e:
             conn.rollback()
@@ -632,9 +702,10 @@ class DataManager(QObject):
 
 
             conn.commit()
+            self._forget_details() # Siblings' display_order shifted as well
             logger.info(f"Topic {topic_id} moved to parent {new_parent_id} at order {new_display_order}.")
-            self.topic_moved.emit(topic_id, new_parent_id, old_parent_id, new_display_order)
-            self.data_changed_bulk.emit() # Moving can affect tree structure significantly
+            self._emit_change(self.topic_moved, topic_id, new_parent_id, old_parent_id, new_display_order)
+            self._emit_change(self.data_changed_bulk) # Moving can affect tree structure significantly
             return True
 
         except Exception as e:
@@ -1,16 +1,33 @@
+import atexit
+import functools
 import logging
 import logging.handlers
 import os
 import platform
+import queue
+import sys
+import time
+import traceback
 from pathlib import Path
 
 APP_NAME = "iromo"
 LOG_FILE_NAME = f"{APP_NAME}_app.log"
 MAX_BYTES = 10 * 1024 * 1024  # 10 MB
 BACKUP_COUNT = 5
+FLUSH_BATCH_SIZE = 64 # Records buffered before the file handler writes them out
+FLUSH_INTERVAL_SECONDS = 0.25 # Max age of the oldest buffered record before a write
+MAX_BUFFERED_RECORDS = 20 * FLUSH_BATCH_SIZE # Kept for a retry while writes fail; older ones are dropped
+CONSOLE_LOG_ENV_VAR = "IROMO_CONSOLE_LOG" # Set to force console logging when stderr isn't a terminal
 
+# Background listener that drains queued log records to the file/console handlers.
+_queue_listener = None
+
+@functools.lru_cache(maxsize=1)
 def get_log_file_path() -> Path:
-    """Determines the appropriate platform-specific path for the log file."""
+    """
+    Determines the appropriate platform-specific path for the log file.
+    The result is cached; the directory itself is created by _ensure_log_dir().
+    """
     system = platform.system()
     if system == "Windows":
         log_dir = Path(os.getenv("APPDATA", Path.home() / "AppData" / "Roaming")) / APP_NAME / "logs"
@@ -19,42 +36,203 @@ def get_log_file_path() -> Path:
     else:  # Linux and other Unix-like systems
         log_dir = Path(os.getenv("XDG_DATA_HOME", Path.home() / ".local" / "share")) / APP_NAME / "logs"
 
-    log_dir.mkdir(parents=True, exist_ok=True)
     return log_dir / LOG_FILE_NAME
 
+def _ensure_log_dir(log_file_path: Path):
+    """Creates the directory that will hold the log file, if needed."""
+    log_file_path.parent.mkdir(parents=True, exist_ok=True)
+
+class CachingFormatter(logging.Formatter):
+    """
+    Formatter that remembers its output on the record, so when the QueueListener hands
+    the same record to the file and console handlers it is only formatted once.
+    """
+
+    def format(self, record):
+        cached = getattr(record, '_iromo_formatted', None)
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        text = super().format(record)
+        record._iromo_formatted = (self, text)
+        return text
+
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that buffers formatted records and writes them with a single
+    write()/flush() once FLUSH_BATCH_SIZE records are pending or the oldest pending
+    record is FLUSH_INTERVAL_SECONDS old. WARNING and above are written immediately
+    (together with anything still buffered) so crash diagnostics are not held back.
+    The age check only runs when a record arrives; when logging goes quiet,
+    IdleFlushQueueListener flushes the handler instead. If a write fails, the records
+    stay buffered (up to MAX_BUFFERED_RECORDS) and are retried with the next write.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buffer: list[str] = []
+        self._last_flush = time.monotonic()
+
+    def emit(self, record):
+        try:
+            self._buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        if (record.levelno >= logging.WARNING
+                or len(self._buffer) >= FLUSH_BATCH_SIZE
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS):
+            self._write_buffer()
+
+    def _write_buffer(self):
+        """Writes out all buffered records, rolling the file over first if they would not fit."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        payload = "".join(self._buffer)
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0:
+                self.stream.seek(0, 2) # Non-POSIX platforms don't position at EOF on open
+                # maxBytes is a size on disk, so measure the encoded payload, not its characters
+                payload_size = len(payload.encode(self.encoding or 'utf-8', self.errors or 'strict'))
+                if self.stream.tell() and self.stream.tell() + payload_size >= self.maxBytes:
+                    super().doRollover()
+                    if self.stream is None: # With delay=True the rollover doesn't reopen the file
+                        self.stream = self._open()
+            self.stream.write(payload)
+            self.stream.flush()
+        except Exception:
+            self._report_write_error()
+            return
+        self._buffer.clear()
+
+    def _report_write_error(self):
+        """
+        Reports a failed write on stderr and trims the buffer kept for the retry.
+        handleError() expects the record being emitted, but a batch write has no single
+        record, so the error is reported here in the same way (honouring raiseExceptions).
+        """
+        dropped = max(0, len(self._buffer) - MAX_BUFFERED_RECORDS)
+        if dropped:
+            del self._buffer[:dropped]
+        if logging.raiseExceptions and sys.stderr:
+            sys.stderr.write("--- Logging error ---\n")
+            traceback.print_exc(file=sys.stderr)
+            sys.stderr.write(f"Could not write to {self.baseFilename}: {len(self._buffer)} record(s) kept "
+                             f"for the next attempt, {dropped} oldest dropped.\n")
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._write_buffer()
+        finally:
+            self.release()
+
+    def doRollover(self):
+        # Keep buffered records in the file they were logged against.
+        self._write_buffer()
+        super().doRollover()
+
+    def close(self):
+        self.acquire()
+        try:
+            self._write_buffer()
+        finally:
+            self.release()
+        super().close()
+
+class IdleFlushQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener that flushes its handlers whenever no record has arrived for
+    FLUSH_INTERVAL_SECONDS, so records buffered by BatchedRotatingFileHandler reach the
+    file even if the application stops logging (e.g. sits idle, then crashes).
+    """
+
+    def dequeue(self, block):
+        if not block:
+            return self.queue.get(block=False)
+        while True:
+            try:
+                return self.queue.get(timeout=FLUSH_INTERVAL_SECONDS)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+
 def setup_logging():
-    """Configures the application-wide logger."""
+    """
+    Configures the application-wide logger.
+
+    The root logger only gets a QueueHandler, so logging from the UI thread is just an
+    enqueue; a QueueListener thread does the actual file and console writes.
+    """
+    global _queue_listener
+
+    # Already configured by an earlier call (e.g., in tests): keep the running listener
+    # instead of tearing it down and reopening the log file.
+    if _queue_listener is not None:
+        return
+
     # Get the root logger so all module loggers inherit this configuration
     logger = logging.getLogger()
     logger.setLevel(logging.DEBUG) # Set root logger level to DEBUG
 
-    # Prevent multiple handlers if setup_logging is called more than once (e.g., in tests)
+    # Drop any handlers installed by someone else so records aren't emitted twice
     if logger.hasHandlers():
         logger.handlers.clear()
 
     log_file_path = get_log_file_path()
+    _ensure_log_dir(log_file_path)
 
-    # Rotating File Handler
-    rfh = logging.handlers.RotatingFileHandler(
+    # Rotating File Handler (batched; see BatchedRotatingFileHandler)
+    rfh = BatchedRotatingFileHandler(
         filename=log_file_path,
         maxBytes=MAX_BYTES,
         backupCount=BACKUP_COUNT,
-        encoding='utf-8'
+        encoding='utf-8',
+        delay=True # Open the file on the first write, on the listener thread
     )
-    formatter = logging.Formatter(
+    # One shared instance, so a record is formatted once for both handlers
+    formatter = CachingFormatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s'
     )
+    # Timestamps in UTC skip the local time zone conversion on every record; the
+    # trailing 'Z' keeps that unambiguous when reading the log.
+    formatter.converter = time.gmtime
+    formatter.default_time_format = '%Y-%m-%d %H:%M:%S'
+    formatter.default_msec_format = '%s.%03dZ'
     rfh.setFormatter(formatter)
-    logger.addHandler(rfh)
 
-    # Optional: Console Handler for development/debugging
-    # To enable, uncomment the following lines.
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    console_handler.setLevel(logging.DEBUG) # Changed to DEBUG to capture all messages
-    logger.addHandler(console_handler)
+    handlers = [rfh]
+
+    # Console Handler for development/debugging. Only installed when someone can see it
+    # (stderr is a terminal) or it's requested explicitly, e.g. IROMO_CONSOLE_LOG=1.
+    console_enabled = bool(os.getenv(CONSOLE_LOG_ENV_VAR)) or (sys.stderr is not None and sys.stderr.isatty())
+    if console_enabled:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        console_handler.setLevel(logging.DEBUG) # Changed to DEBUG to capture all messages
+        handlers.append(console_handler)
+
+    log_queue = queue.Queue(-1) # Unbounded, so logging never blocks the caller
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = IdleFlushQueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _queue_listener.start()
+
+    logger.info(f"Logging initialized. Log file: {log_file_path}. Console output {'enabled' if console_enabled else 'disabled'}. Log level: DEBUG")
+
+def _stop_queue_listener():
+    """Flushes any queued records and stops the listener thread (registered with atexit)."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener = None
 
-    logger.info(f"Logging initialized. Log file: {log_file_path}. Console output enabled. Log level: DEBUG")
+atexit.register(_stop_queue_listener)
 
 if __name__ == '__main__':
     # Example usage:
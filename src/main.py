@@ -4,18 +4,22 @@ import sys
 from PyQt6.QtWidgets import QApplication
 
 from .logger_config import APP_NAME, setup_logging
-from .main_window import MainWindow
+
+logger = logging.getLogger(APP_NAME)
 
 def run_app():
     """Initializes and runs the Iromo application."""
     setup_logging()
-    logger = logging.getLogger(APP_NAME)
+    # Imported here so logging is set up before the widget stack loads, and importing
+    # this module alone doesn't pull in the whole UI.
+    from .main_window import MainWindow
+
     logger.info("Iromo application starting...")
     app = QApplication(sys.argv)
     main_win = MainWindow()
     main_win.show()
     exit_code = app.exec()
-    logger.info(f"Iromo application finished with exit code {exit_code}.")
+    logger.info("Iromo application finished with exit code %s.", exit_code)
     sys.exit(exit_code)
 
 if __name__ == '__main__':
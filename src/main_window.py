@@ -1,9 +1,12 @@
-import json
+from __future__ import annotations
+
+import hashlib
 import logging
 import os
 import sys
+from contextlib import contextmanager
 
-from PyQt6.QtCore import QSettings, Qt, QTimer
+from PyQt6.QtCore import QCoreApplication, QEvent, QEventLoop, QObject, QRunnable, QSettings, Qt, QThread, QThreadPool, QTimer, pyqtSignal, pyqtSlot
 from PyQt6.QtGui import QAction, QKeySequence, QFont, QFontDatabase
 from PyQt6.QtWidgets import (
     QApplication,
@@ -11,26 +14,68 @@ from PyQt6.QtWidgets import (
     QLabel,
     QMainWindow,
     QMessageBox,
+    QProgressDialog,
     QSplitter,
     QToolBar,
 )
 
-from .commands.topic_commands import (
-    ChangeTopicTitleCommand,
-    CreateTopicCommand,
-    ExtractTextCommand,
-)
 from .data_manager import DB_FILENAME, TEXT_FILES_SUBDIR, DataManager
 from .knowledge_tree_widget import KnowledgeTreeWidget
 from .topic_editor_widget import TopicEditorWidget
 from .undo_manager import UndoManager
-from .settings_dialog import SettingsDialog
+from .settings_dialog import APP_NAME, APP_ORGANIZATION_NAME, SettingsDialog # Names for QSettings
 from .logger_config import setup_logging # For log level changes
 # Import MoveTopicCommand when tree reordering is implemented
 logger = logging.getLogger(__name__)
-APP_ORGANIZATION_NAME = "IromoOrg" # For QSettings
-APP_NAME = "Iromo" # For QSettings
+APP_VERSION = "unknown" # Recorded in new collection manifests
 COLLECTION_MANIFEST_FILE = "iromo_collection.json"
+# Fixed layout of a new collection's manifest (what json.dump(..., indent=2) produced);
+# "created_at" holds the app version, which must not need JSON escaping.
+_MANIFEST_TEMPLATE = b'{\n  "type": "iromo_collection",\n  "version": "1.0",\n  "created_at": "%b"\n}\n'
+
+def _write_file_atomic(path, data: bytes):
+    """
+    Writes data to a temporary file next to path with a single os.write() and then
+    renames it over path, so readers never see a partially written file.
+    """
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view: # os.write() may write less than asked for
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+class InitCollectionSignals(QObject):
+    finished = pyqtSignal(object) # DataManager, ready to use
+    failed = pyqtSignal(str, object) # collection_path, exception
+
+class InitCollectionTask(QRunnable):
+    """
+    Creates a DataManager and runs initialize_collection_storage() (DB creation,
+    text_files dir, migrations) on a QThreadPool thread instead of the UI thread.
+    """
+
+    def __init__(self, collection_path):
+        super().__init__()
+        self.collection_path = collection_path
+        self.signals = InitCollectionSignals()
+        # The DataManager is created on the pool thread; hand it back to the thread
+        # that submitted the task so its signals are delivered there.
+        self._owner_thread = QThread.currentThread()
+
+    def run(self):
+        try:
+            data_manager = DataManager(self.collection_path)
+            data_manager.initialize_collection_storage() # Creates DB, text_files dir, applies migrations
+            data_manager.moveToThread(self._owner_thread)
+        except Exception as e:
+            logger.error(f"InitCollectionTask: Failed to initialize collection at {self.collection_path}: {e}", exc_info=True)
+            self.signals.failed.emit(self.collection_path, e)
+            return
+        self.signals.finished.emit(data_manager)
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -38,65 +83,114 @@ class MainWindow(QMainWindow):
 
         self.data_manager = None
         self.active_collection_path = None
+        self._collection_basename = None # os.path.basename(active_collection_path), for the window title
         self.undo_manager = UndoManager(self)
         self.actions_map = {} # For managing QActions and their shortcuts
+        self._settings = QSettings(APP_ORGANIZATION_NAME, APP_NAME) # Created once; QSettings is costly to construct
+        # Mirror of the stored "last_opened_collection", so unchanged values aren't written again
+        self._last_saved_collection_path = self._settings.value("last_opened_collection") or None
+        # Settings writes stay in memory and are flushed together shortly afterwards
+        self._settings_sync_timer = QTimer(self)
+        self._settings_sync_timer.setSingleShot(True)
+        self._settings_sync_timer.setInterval(500)
+        self._settings_sync_timer.timeout.connect(self._settings.sync)
+        self._home_dir = os.path.expanduser("~") # Fallback start directory for the collection dialogs
+        self._init_task = None # Pending InitCollectionTask while a collection is being opened
+        self._open_progress = None # Busy indicator shown while _init_task runs
+        # dirty_changed fires on every keystroke; bursts of title updates are coalesced into one
+        self._last_window_title = "" # Last caption passed to setWindowTitle()
+        self._title_timer = QTimer(self)
+        self._title_timer.setSingleShot(True)
+        self._title_timer.setInterval(50)
+        self._title_timer.timeout.connect(self._do_update_window_title)
+        self._last_collection_open_state = None # collection_open as last applied by _update_ui_for_collection_state
+        self._force_close = False # Set once the user agreed to close despite unsaved changes
+        self._bulk_depth = 0 # > 0 while a bulk refresh runs; per-topic DataManager handlers stand down
+        self._bulk_refresh_timer = QTimer(self)
+        self._bulk_refresh_timer.setSingleShot(True)
+        self._bulk_refresh_timer.setInterval(50)
+        self._bulk_refresh_timer.timeout.connect(self._do_bulk_refresh)
+        # The most recently created topic; selected and loaded once a burst of creations is over
+        self._created_topic_to_select = None
+        self._created_selection_timer = QTimer(self)
+        self._created_selection_timer.setSingleShot(True)
+        self._created_selection_timer.setInterval(0)
+        self._created_selection_timer.timeout.connect(self._select_created_topic)
 
         self.setWindowTitle(f"{APP_NAME} - No Collection Open")
-        self.setGeometry(100, 100, 1024, 768)
+        # Restore last session's window geometry; the default size is only for the first launch.
+        geometry = self._settings.value("geometry")
+        if geometry is None or not self.restoreGeometry(geometry):
+            self.setGeometry(100, 100, 1024, 768)
 
-        self._create_menu_bar() # Populates self.actions_map with initial QActions and default shortcuts
+        self._create_primary_menus() # Populates self.actions_map with initial QActions and default shortcuts
         self._create_tool_bar() # Adds to self.actions_map
         self._setup_central_widget()
+        # tree_widget/editor_widget and all actions exist from here on; later code relies on it
+        assert self.editor_widget is not None and self.tree_widget is not None
+        # (DataManager signal name, slot, connection type) triples, connected on open and disconnected on close
+        # Per-topic changes are queued, so a burst of them (bulk delete, import, renames) is
+        # handled between paint/input events instead of inline in the emitting call.
+        queued = Qt.ConnectionType.QueuedConnection
+        auto = Qt.ConnectionType.AutoConnection
+        self._dm_signal_map = (
+            ("topic_created", self._on_dm_topic_created, queued),
+            ("topic_title_changed", self._on_dm_topic_title_changed, queued),
+            ("topic_content_saved", self._on_dm_topic_content_saved, auto),
+            ("topic_deleted", self._on_dm_topic_deleted, queued),
+            # Highlight updates are the editor's business; no need to go through this window.
+            ("extraction_created", self.editor_widget.on_extraction_created, queued),
+            ("extraction_deleted", self.editor_widget.on_extraction_deleted, queued),
+            ("topic_moved", self._on_dm_topic_moved, queued),
+            ("data_changed_bulk", self._on_dm_data_changed_bulk, queued),
+            ("shortcuts_changed", self._update_all_action_shortcuts, auto),
+        )
+        self._dm_connections = [] # QMetaObject.Connection handles currently connected from _dm_signal_map
+
         self._connect_signals() # UndoManager signals connected here
         self.autosave_timer = QTimer(self) # For autosave functionality
         
         self._update_ui_for_collection_state() # Initial UI state (enables/disables actions)
-        self.undo_manager._update_signals() # Ensure initial state of undo/redo actions
+        self.undo_manager._update_signals(force=True) # Ensure initial state of undo/redo actions
         self._apply_initial_settings() # Apply settings on startup
-        self._try_load_last_collection() # This might load a DM and trigger shortcut updates via _open_collection
+        # Deferred until the event loop runs, so the window paints before the View/Help menus
+        # are built and before the collection (DB migrations, tree load) is opened.
+        QTimer.singleShot(0, self._create_secondary_menus)
+        QTimer.singleShot(0, self._try_load_last_collection) # This might load a DM and trigger shortcut updates via _open_collection
         
         # If no collection is loaded by _try_load_last_collection,
-        # the shortcuts remain as set in _create_menu_bar and _create_tool_bar.
+        # the shortcuts remain as set in the _create_*_menus methods and _create_tool_bar.
         # If a collection is loaded, _open_collection calls _update_all_action_shortcuts
         # which will then apply DM-managed shortcuts.
         self.undo_manager.command_executed.connect(self._handle_command_executed)
 
-    def _create_menu_bar(self):
+    def _create_primary_menus(self):
+        """Builds the File and Edit menus, which have to be there for the first paint."""
         menu_bar = self.menuBar()
         file_menu = menu_bar.addMenu("&File")
 
-        new_collection_action = QAction("&New Collection...", self)
-        new_collection_action.triggered.connect(self._handle_new_collection)
-        new_collection_action.setShortcut(QKeySequence("Ctrl+Shift+N")) # Initial default
-        file_menu.addAction(new_collection_action)
-        self.actions_map["file.new_collection"] = new_collection_action
-
-        open_collection_action = QAction("&Open Collection...", self)
-        open_collection_action.triggered.connect(self._handle_open_collection)
-        open_collection_action.setShortcut(QKeySequence("Ctrl+O")) # Initial default
-        file_menu.addAction(open_collection_action)
-        self.actions_map["file.open_collection"] = open_collection_action
-
-        self.close_collection_action = QAction("&Close Collection", self)
-        self.close_collection_action.triggered.connect(self._handle_close_collection)
-        self.close_collection_action.setShortcut(QKeySequence("Ctrl+Shift+W")) # Initial default
-        file_menu.addAction(self.close_collection_action)
-        self.actions_map["file.close_collection"] = self.close_collection_action
-        
-        file_menu.addSeparator()
-
-        self.new_topic_action = QAction("&New Topic", self)
-        self.new_topic_action.triggered.connect(self._handle_new_topic_action)
-        self.new_topic_action.setShortcut(QKeySequence("Ctrl+N")) # Initial default
-        file_menu.addAction(self.new_topic_action)
-        self.actions_map["file.new_topic"] = self.new_topic_action
-        
-        file_menu.addSeparator()
-        exit_action = QAction("&Exit", self)
-        exit_action.triggered.connect(self.close) # QMainWindow.close
-        exit_action.setShortcut(QKeySequence("Ctrl+Q")) # Initial default
-        file_menu.addAction(exit_action)
-        self.actions_map["app.quit"] = exit_action
+        # (action_id, label, slot, initial default shortcut, attribute to store it as); None is a separator
+        file_actions = (
+            ("file.new_collection", "&New Collection...", self._handle_new_collection, "Ctrl+Shift+N", None),
+            ("file.open_collection", "&Open Collection...", self._handle_open_collection, "Ctrl+O", None),
+            ("file.close_collection", "&Close Collection", self._handle_close_collection, "Ctrl+Shift+W", "close_collection_action"),
+            None,
+            ("file.new_topic", "&New Topic", self._handle_new_topic_action, "Ctrl+N", "new_topic_action"),
+            None,
+            ("app.quit", "&Exit", self.close, "Ctrl+Q", None), # QMainWindow.close
+        )
+        for spec in file_actions:
+            if spec is None:
+                file_menu.addSeparator()
+                continue
+            action_id, label, slot, shortcut, attr_name = spec
+            action = QAction(label, self)
+            action.triggered.connect(slot)
+            action.setShortcut(QKeySequence(shortcut))
+            file_menu.addAction(action)
+            self.actions_map[action_id] = action
+            if attr_name:
+                setattr(self, attr_name, action)
 
         edit_menu = menu_bar.addMenu("&Edit")
 
@@ -123,7 +217,10 @@ class MainWindow(QMainWindow):
         self.preferences_action.triggered.connect(self.open_settings_dialog)
         self.preferences_action.setShortcut(QKeySequence("Ctrl+,")) # Initial default
         self.actions_map["app.preferences"] = self.preferences_action
-        
+
+    def _create_secondary_menus(self):
+        """Builds the View and Help menus; scheduled from __init__ to run after the window is shown."""
+        menu_bar = self.menuBar()
         view_menu = menu_bar.addMenu("&View")
         # Example for a view action if it were to be added:
         # self.toggle_tree_action = QAction("Toggle Knowledge Tree", self)
@@ -137,6 +234,8 @@ class MainWindow(QMainWindow):
         about_action.setShortcut(QKeySequence("F1")) # Initial default
         help_menu.addAction(about_action)
         self.actions_map["help.about"] = about_action
+        if self.data_manager: # A collection got opened first; give these actions its shortcuts too
+            self._update_all_action_shortcuts()
 
     def _create_tool_bar(self):
         toolbar = QToolBar("Main Toolbar")
@@ -157,7 +256,13 @@ class MainWindow(QMainWindow):
         
         self.splitter.addWidget(self.tree_widget)
         self.splitter.addWidget(self.editor_widget)
-        self.splitter.setSizes([self.width() // 3, 2 * self.width() // 3])
+        # Tree gets a third of the width and the editor the rest; Qt applies the ratio when laid out
+        self.splitter.setStretchFactor(0, 1)
+        self.splitter.setStretchFactor(1, 2)
+        # Sizes from the last session, if any, take precedence over the stretch ratio
+        splitter_state = self._settings.value("splitterState")
+        if splitter_state is not None:
+            self.splitter.restoreState(splitter_state)
         self.setCentralWidget(self.splitter)
 
     def _connect_signals(self):
@@ -172,21 +277,24 @@ class MainWindow(QMainWindow):
         self.undo_manager.redo_text_changed.connect(self.redo_action.setText)
 
     def _update_window_title(self):
+        """Schedules a window title refresh; repeated calls within the timer interval collapse into one."""
+        self._title_timer.start()
+
+    def _do_update_window_title(self):
         title_parts = [APP_NAME]
-        is_dirty = self.editor_widget.is_dirty() if self.editor_widget else False
-        current_editor_topic_id = self.editor_widget.current_topic_id if self.editor_widget else None
+        is_dirty = self.editor_widget.is_dirty()
+        current_editor_topic_id = self.editor_widget.current_topic_id
 
         if self.active_collection_path and self.data_manager:
-            collection_name = os.path.basename(self.active_collection_path)
-            title_parts.append(collection_name)
+            title_parts.append(self._collection_basename)
             
             if current_editor_topic_id:
-                details = self.data_manager.get_topic_details(current_editor_topic_id)
-                if details and details.get('title'):
-                    title_parts.append(details['title'])
-                elif details: # Topic exists but maybe title is empty or None
+                topic_title = self._get_current_topic_title(current_editor_topic_id)
+                if topic_title:
+                    title_parts.append(topic_title)
+                elif topic_title is not None: # Topic exists but maybe title is empty or None
                     title_parts.append("Editing Topic")
-                # If details is None, means topic_id is invalid or not found, title remains collection level
+                # If topic_title is None, means topic_id is invalid or not found, title remains collection level
         else:
             title_parts.append("No Collection Open")
         
@@ -194,63 +302,99 @@ class MainWindow(QMainWindow):
         if is_dirty and current_editor_topic_id: # Only show dirty if a topic is actually loaded and dirty
             final_title += " *"
         
+        if final_title == self._last_window_title:
+            return
+        self._last_window_title = final_title
         self.setWindowTitle(final_title)
 
+    def _get_current_topic_title(self, topic_id):
+        """
+        Returns the title of the given topic, preferring the one the editor was loaded
+        with when it is the editor's topic. None means the topic wasn't found.
+        """
+        editor = self.editor_widget
+        if topic_id == editor.current_topic_id and editor.current_topic_title is not None:
+            return editor.current_topic_title
+        title = self.tree_widget.model.title_for_id(topic_id)
+        if title is None: # Not in the tree (yet); fall back to the database
+            details = self.data_manager.get_topic_details(topic_id)
+            title = (details.get('title') or "") if details else None
+        if topic_id == editor.current_topic_id:
+            editor.current_topic_title = title
+        return title
+
+    def _invalidate_current_topic_title(self):
+        self.editor_widget.current_topic_title = None
+
     def _update_ui_for_collection_state(self):
         collection_open = self.data_manager is not None
-        
-        # Actions that require a collection to be open
-        if hasattr(self, 'close_collection_action'): # Ensure actions are created
+
+        # Actions, tree and editor only need touching when a collection was opened or closed
+        if collection_open != self._last_collection_open_state:
+            self._last_collection_open_state = collection_open
+
+            # Actions that require a collection to be open (all created in __init__ before this runs)
             self.close_collection_action.setEnabled(collection_open)
-        if hasattr(self, 'new_topic_action'):
             self.new_topic_action.setEnabled(collection_open)
-        if hasattr(self, 'extract_action_toolbar'):
             self.extract_action_toolbar.setEnabled(collection_open)
-        if hasattr(self, 'preferences_action'):
             self.preferences_action.setEnabled(collection_open) # SettingsDialog now requires DataManager
 
-        # Undo/Redo are enabled/disabled by UndoManager's signals directly,
-        # but also depend on collection state for initial setup.
-        if hasattr(self, 'undo_action'): # Check if undo_action exists
+            # Undo/Redo are enabled/disabled by UndoManager's signals directly,
+            # but also depend on collection state for initial setup.
             self.undo_action.setEnabled(collection_open and self.undo_manager.can_undo())
-        if hasattr(self, 'redo_action'): # Check if redo_action exists
             self.redo_action.setEnabled(collection_open and self.undo_manager.can_redo())
-        
-        if not collection_open:
-            self.tree_widget.clear_tree()
-            if self.editor_widget: # Ensure editor widget exists before clearing
-                self.editor_widget.clear_content()
+
+            if not collection_open:
+                self.tree_widget.clear_tree()
+                if self.editor_widget.current_topic_id is not None:
+                    self.editor_widget.clear_content()
 
         self._update_window_title() # Centralized title update
             
     def _save_last_collection_path(self, path):
-        settings = QSettings(APP_ORGANIZATION_NAME, APP_NAME)
+        # Skip the settings write when the stored value wouldn't change.
+        path = path or None
+        if path == self._last_saved_collection_path:
+            return
+        self._last_saved_collection_path = path
         if path:
-            settings.setValue("last_opened_collection", path)
+            self._settings.setValue("last_opened_collection", path)
+        else:
+            self._settings.remove("last_opened_collection")
+        self._settings_sync_timer.start()
+
+    @staticmethod
+    def _expanded_topics_key(collection_path):
+        # Paths contain '/' (a QSettings group separator) or backslashes, so key by a digest instead
+        return "expanded_topics/" + hashlib.sha1(os.path.normcase(collection_path).encode('utf-8')).hexdigest()
+
+    def _load_expanded_topic_ids(self, collection_path):
+        """Returns the ids of the topics that were expanded when the collection was last closed."""
+        return self._settings.value(self._expanded_topics_key(collection_path), [], type=list)
+
+    def _save_expanded_topic_ids(self, collection_path):
+        """Remembers which topics are expanded, so reopening the collection restores them."""
+        key = self._expanded_topics_key(collection_path)
+        expanded_ids = self.tree_widget.expanded_topic_ids()
+        if expanded_ids:
+            self._settings.setValue(key, expanded_ids)
         else:
-            settings.remove("last_opened_collection")
+            self._settings.remove(key)
+        self._settings_sync_timer.start()
 
     def _try_load_last_collection(self):
-        settings = QSettings(APP_ORGANIZATION_NAME, APP_NAME)
-        last_path = settings.value("last_opened_collection")
+        last_path = self._settings.value("last_opened_collection")
 
         if not last_path:
             logger.info("No last opened collection path found in settings.")
             return
 
-        if not os.path.isdir(last_path):
-            logger.warning(
-                f"Last opened collection path '{last_path}' is not a valid directory. "
-                "Clearing setting."
-            )
-            self._save_last_collection_path(None) # Clear invalid path
-            return
-
+        # One stat: a manifest that is a file implies the directory exists as well.
         manifest_path = os.path.join(last_path, COLLECTION_MANIFEST_FILE)
-        if not os.path.exists(manifest_path):
+        if not os.path.isfile(manifest_path):
             logger.warning(
-                f"Last opened collection path '{last_path}' does not contain a manifest file "
-                f"'{COLLECTION_MANIFEST_FILE}'. Clearing setting."
+                f"Last opened collection path '{last_path}' is not a directory containing a manifest "
+                f"file '{COLLECTION_MANIFEST_FILE}'. Clearing setting."
             )
             self._save_last_collection_path(None) # Clear invalid path
             return
@@ -260,11 +404,12 @@ class MainWindow(QMainWindow):
         # _open_collection handles its own errors, including logging and user messages.
         # If it fails, data_manager will be None, and UI will reflect no collection open.
 
+    @pyqtSlot()
     def _handle_new_collection(self):
         dir_path = QFileDialog.getSaveFileName(
             self, 
             "Create New Collection Folder", 
-            os.path.expanduser("~"), # Start in home directory
+            self._settings.value("last_new_collection_dir", self._home_dir), # Start where the last collection was created
             "Folders" # This is a bit of a hack for QFileDialog to act like a folder creator
                       # A better way might be to get a directory and then append a new folder name.
                       # For now, user selects/creates a folder.
@@ -272,24 +417,32 @@ class MainWindow(QMainWindow):
 
         if not dir_path:
             return # User cancelled
+        self._settings.setValue("last_new_collection_dir", os.path.dirname(dir_path))
+        self._settings_sync_timer.start()
 
-        # Ensure the directory exists, QFileDialog for saving might not create it.
-        if not os.path.exists(dir_path):
+        # One directory listing tells whether the folder exists, is a folder, and already
+        # holds collection files, instead of a stat per path.
+        try:
+            with os.scandir(dir_path) as entries:
+                existing_names = {entry.name for entry in entries}
+        except FileNotFoundError:
+            # Ensure the directory exists, QFileDialog for saving might not create it.
+            existing_names = set()
             try:
                 os.makedirs(dir_path)
             except OSError as e:
                 QMessageBox.critical(self, "Error", f"Could not create directory: {dir_path}\n{e}")
                 return
-        elif not os.path.isdir(dir_path):
-             QMessageBox.critical(self, "Error", f"Selected path is not a directory: {dir_path}")
-             return
+        except NotADirectoryError:
+            QMessageBox.critical(self, "Error", f"Selected path is not a directory: {dir_path}")
+            return
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Could not read directory: {dir_path}\n{e}")
+            return
 
         # Check if it's already a collection or contains conflicting files
         manifest_path = os.path.join(dir_path, COLLECTION_MANIFEST_FILE)
-        db_path = os.path.join(dir_path, DB_FILENAME)
-        text_dir_path = os.path.join(dir_path, TEXT_FILES_SUBDIR)
-
-        if os.path.exists(manifest_path) or os.path.exists(db_path) or os.path.exists(text_dir_path):
+        if existing_names & {COLLECTION_MANIFEST_FILE, DB_FILENAME, TEXT_FILES_SUBDIR}:
             reply = QMessageBox.question(self, "Warning",
                                          "The selected directory is not empty or might already be an Iromo collection. "
                                          "Do you want to try to initialize it as a new collection anyway? "
@@ -299,57 +452,130 @@ class MainWindow(QMainWindow):
                 return
         
         # Create manifest file
+        manifest_bytes = _MANIFEST_TEMPLATE % APP_VERSION.encode('utf-8')
         try:
-            with open(manifest_path, 'w') as f:
-                json.dump({
-                    "type": "iromo_collection",
-                    "version": "1.0",
-                    "created_at": QSettings().value("app_version", "unknown") # Placeholder for app version
-                }, f, indent=2)
-        except IOError as e:
+            _write_file_atomic(manifest_path, manifest_bytes)
+        except OSError as e:
             QMessageBox.critical(self, "Error", f"Could not create manifest file: {manifest_path}\n{e}")
             return
 
         self._open_collection(dir_path, is_new=True)
 
 
+    @pyqtSlot()
     def _handle_open_collection(self):
-        dir_path = QFileDialog.getExistingDirectory(self, "Open Iromo Collection", os.path.expanduser("~"))
+        start_dir = self._settings.value("last_open_collection_dir", self._home_dir)
+        dir_path = QFileDialog.getExistingDirectory(self, "Open Iromo Collection", start_dir)
         if dir_path:
+            # Remember the folder the collection lives in, so the next dialog starts next to it
+            self._settings.setValue("last_open_collection_dir", os.path.dirname(dir_path))
+            self._settings_sync_timer.start()
             self._open_collection(dir_path)
 
     def _open_collection(self, collection_path, is_new=False):
         manifest_path = os.path.join(collection_path, COLLECTION_MANIFEST_FILE)
         
-        if not is_new and not os.path.exists(manifest_path):
+        if not is_new and not os.path.isfile(manifest_path):
             QMessageBox.warning(self, "Not an Iromo Collection",
                                 f"The selected folder '{collection_path}' does not appear to be a valid Iromo collection (missing '{COLLECTION_MANIFEST_FILE}').")
             return
 
+        if self._init_task is not None:
+            logger.warning(f"Ignoring request to open {collection_path}: {self._init_task.collection_path} is still being opened.")
+            return
+
         if self.data_manager: # Close existing collection first
             self._handle_close_collection()
 
+        # Storage initialization (DB, migrations) runs on the thread pool; the rest of
+        # the opening continues in _finish_open_collection once it's done.
+        self._open_progress = QProgressDialog(f"Opening collection:\n{collection_path}", None, 0, 0, self)
+        self._open_progress.setWindowTitle(APP_NAME)
+        self._open_progress.setWindowModality(Qt.WindowModality.ApplicationModal)
+        self._open_progress.setCancelButton(None)
+        self._open_progress.setMinimumDuration(0)
+        self._open_progress.show()
+
+        # Show that the collection is loading; the regular title comes back with the
+        # _update_window_title() call once the task reports back.
+        self._title_timer.stop()
+        self._last_window_title = f"{APP_NAME} - Loading…"
+        self.setWindowTitle(self._last_window_title)
+        # Until load_tree_data() replaces it, the (empty) tree says so as well
+        self.tree_widget.model.set_placeholder_text("Loading collection…")
+
+        task = InitCollectionTask(collection_path)
+        task.signals.finished.connect(self._finish_open_collection, Qt.ConnectionType.QueuedConnection)
+        task.signals.failed.connect(self._handle_open_collection_failed, Qt.ConnectionType.QueuedConnection)
+        self._init_task = task # Keep the task (and its signals object) alive until it reports back
+        QThreadPool.globalInstance().start(task)
+
+    def _connect_data_manager_signals(self):
+        # Each connection is recorded as it is made, so a failure part-way through (or any
+        # later failure while opening) disconnects exactly what was connected.
+        for signal_name, slot, connection_type in self._dm_signal_map:
+            connection = getattr(self.data_manager, signal_name).connect(slot, connection_type)
+            self._dm_connections.append(connection)
+
+    def _disconnect_data_manager_signals(self):
+        # Deliver queued DataManager notifications while the collection is still open,
+        # so none of them runs against the next collection (or none).
+        QCoreApplication.sendPostedEvents(self, QEvent.Type.MetaCall)
+        QCoreApplication.sendPostedEvents(self.editor_widget, QEvent.Type.MetaCall)
+        # By handle, so Qt doesn't have to look each slot up in the signal's connection list
+        connections, self._dm_connections = self._dm_connections, []
+        for connection in connections:
+            QObject.disconnect(connection)
+
+    @contextmanager
+    def _tree_batch(self):
+        """
+        Suspends tree painting and the tree widget's signals for a multi-step tree
+        mutation, then repaints once. Nests: the outermost batch restores the state.
+        """
+        tree = self.tree_widget
+        updates_were_enabled = tree.updatesEnabled()
+        tree.setUpdatesEnabled(False)
+        signals_were_blocked = tree.blockSignals(True)
+        try:
+            yield
+        finally:
+            tree.blockSignals(signals_were_blocked)
+            tree.setUpdatesEnabled(updates_were_enabled)
+            if updates_were_enabled:
+                tree.viewport().update()
+
+    def _end_open_collection_task(self):
+        self._init_task = None
+        if self._open_progress:
+            self._open_progress.close()
+            self._open_progress.deleteLater()
+            self._open_progress = None
+
+    @pyqtSlot(str, object)
+    def _handle_open_collection_failed(self, collection_path, error):
+        self._end_open_collection_task()
+        self.tree_widget.clear_tree() # Drops the "Loading collection…" placeholder
+        QMessageBox.critical(self, "Error Opening Collection", f"Could not open or initialize collection: {collection_path}\n{error}")
+        self._update_ui_for_collection_state()
+
+    @pyqtSlot(object)
+    def _finish_open_collection(self, new_data_manager):
+        self._end_open_collection_task()
+        collection_path = new_data_manager.collection_base_path
+
         try:
-            new_data_manager = DataManager(collection_path)
-            new_data_manager.initialize_collection_storage() # Creates DB, text_files dir, applies migrations
-            
             self.data_manager = new_data_manager
             self.active_collection_path = collection_path
+            self._collection_basename = os.path.basename(collection_path)
             
-            # Connect DataManager signals
-            self.data_manager.topic_created.connect(self._on_dm_topic_created)
-            self.data_manager.topic_title_changed.connect(self._on_dm_topic_title_changed)
-            self.data_manager.topic_content_saved.connect(self._on_dm_topic_content_saved)
-            self.data_manager.topic_deleted.connect(self._on_dm_topic_deleted)
-            self.data_manager.extraction_created.connect(self._on_dm_extraction_created)
-            self.data_manager.extraction_deleted.connect(self._on_dm_extraction_deleted)
-            self.data_manager.topic_moved.connect(self._on_dm_topic_moved)
-            self.data_manager.data_changed_bulk.connect(self._on_dm_data_changed_bulk)
-            self.data_manager.shortcuts_changed.connect(self._update_all_action_shortcuts)
-
-
-            # Load data into UI
-            self.tree_widget.load_tree_data(self.data_manager)
+            self._connect_data_manager_signals()
+
+
+            # Load data into UI, with the tree's signals and painting held for the whole load
+            self.tree_widget.set_expanded_topic_ids(self._load_expanded_topic_ids(collection_path))
+            with self._tree_batch():
+                self.tree_widget.load_tree_data(self.data_manager)
             self.editor_widget.clear_content()
             self.undo_manager.clear_stacks()
             
@@ -359,55 +585,48 @@ class MainWindow(QMainWindow):
             logger.info(f"Successfully opened collection: {collection_path}")
         except Exception as e:
             logger.error(f"Failed to open or initialize collection at {collection_path}: {e}", exc_info=True)
+            self._disconnect_data_manager_signals() # Whatever got connected before the failure
+            self.tree_widget.clear_tree() # May have been loaded part-way
             QMessageBox.critical(self, "Error Opening Collection", f"Could not open or initialize collection: {collection_path}\n{e}")
-            if self.data_manager: # Disconnect if connection partially failed
-                try:
-                    self.data_manager.topic_created.disconnect(self._on_dm_topic_created)
-                    self.data_manager.topic_title_changed.disconnect(self._on_dm_topic_title_changed)
-                    self.data_manager.topic_content_saved.disconnect(self._on_dm_topic_content_saved)
-                    self.data_manager.topic_deleted.disconnect(self._on_dm_topic_deleted)
-                    self.data_manager.extraction_created.disconnect(self._on_dm_extraction_created)
-                    self.data_manager.extraction_deleted.disconnect(self._on_dm_extraction_deleted)
-                    self.data_manager.topic_moved.disconnect(self._on_dm_topic_moved)
-                    self.data_manager.data_changed_bulk.disconnect(self._on_dm_data_changed_bulk)
-                    self.data_manager.shortcuts_changed.disconnect(self._update_all_action_shortcuts)
-                except TypeError: # Signals might not be connected if DM init failed early
-                    pass
             self.data_manager = None
             self.active_collection_path = None
+            self._collection_basename = None
         
         self._update_ui_for_collection_state()
 
+    @pyqtSlot()
     def _handle_close_collection(self):
+        self._close_collection()
+
+    def _close_collection(self, forget_last_collection=True, save_dirty_topic=True):
+        """
+        Closes the open collection. With forget_last_collection=False the remembered
+        "last opened collection" setting is left alone (used when the app itself closes).
+        With save_dirty_topic=False unsaved editor changes aren't saved first, for callers
+        that already tried, or whose user chose to discard them.
+        """
         if not self.data_manager:
             return
 
         logger.info(f"Closing collection: {self.active_collection_path}")
         # Ensure current topic is saved if dirty
-        if self.editor_widget and self.editor_widget.current_topic_id and self.editor_widget.is_dirty():
+        if save_dirty_topic and self.editor_widget.current_topic_id and self.editor_widget.is_dirty():
             logger.info(f"Collection close: Forcing save for dirty topic {self.editor_widget.current_topic_id}.")
-            self.editor_widget.force_save_if_dirty(wait_for_completion=True) # Wait for save to finish
+            self._force_save_and_wait() # Wait for save to finish
+
+        self._save_expanded_topic_ids(self.active_collection_path)
 
         # Disconnect DataManager signals
         if self.data_manager:
-            try:
-                self.data_manager.topic_created.disconnect(self._on_dm_topic_created)
-                self.data_manager.topic_title_changed.disconnect(self._on_dm_topic_title_changed)
-                self.data_manager.topic_content_saved.disconnect(self._on_dm_topic_content_saved)
-                self.data_manager.topic_deleted.disconnect(self._on_dm_topic_deleted)
-                self.data_manager.extraction_created.disconnect(self._on_dm_extraction_created)
-                self.data_manager.extraction_deleted.disconnect(self._on_dm_extraction_deleted)
-                self.data_manager.topic_moved.disconnect(self._on_dm_topic_moved)
-                self.data_manager.data_changed_bulk.disconnect(self._on_dm_data_changed_bulk)
-                self.data_manager.shortcuts_changed.disconnect(self._update_all_action_shortcuts)
-            except TypeError:
-                logger.warning("Error disconnecting DataManager signals during close, possibly already disconnected or never connected.")
-                pass
+            self._disconnect_data_manager_signals()
 
 
         self.data_manager = None
         self.active_collection_path = None
-        self._save_last_collection_path(None) # Clear last opened path
+        self._collection_basename = None
+        self._invalidate_current_topic_title()
+        if forget_last_collection:
+            self._save_last_collection_path(None) # Clear last opened path
         self.undo_manager.clear_stacks()
         self._update_ui_for_collection_state()
         # Shortcuts will remain as they were from the last collection.
@@ -416,8 +635,35 @@ class MainWindow(QMainWindow):
         # For now, they persist, which is acceptable.
 
 
+    def _force_save_and_wait(self):
+        """
+        Saves the editor's dirty topic on its background thread and runs a local event loop
+        until the save has been handled, so the window keeps repainting in the meantime.
+        User input is held back until the loop ends, but queued signals and timers still
+        run, so callers re-check their state (collection, selection) afterwards.
+        """
+        # A save that was already running when we got here wrote older content, so the
+        # editor may still be dirty after it; in that case save once more.
+        for _ in range(2):
+            save_task = self.editor_widget.force_save_if_dirty()
+            if save_task is None:
+                return
+            loop = QEventLoop(self)
+            self.editor_widget.save_finished.connect(loop.quit)
+            try:
+                # The save is only handled on this thread, so it can't have finished before
+                # the connect above; the check guards against a save that never started.
+                if self.editor_widget.save_task is save_task:
+                    # No clicks or key presses: they would re-enter the caller mid-operation
+                    loop.exec(QEventLoop.ProcessEventsFlag.ExcludeUserInputEvents)
+            finally:
+                self.editor_widget.save_finished.disconnect(loop.quit)
+            if not self.editor_widget.is_dirty():
+                return
+
     # --- Shortcut Management ---
 
+    @pyqtSlot()
     def _update_all_action_shortcuts(self):
         if not self.data_manager:
             # This means initial app state shortcuts (hardcoded or StandardKey) remain.
@@ -445,6 +691,7 @@ class MainWindow(QMainWindow):
 
     # --- Command Execution Handlers & Signal Handlers ---
 
+    @pyqtSlot(object)
     def _handle_command_executed(self, command):
         """
         Slot connected to UndoManager.command_executed signal.
@@ -462,6 +709,7 @@ class MainWindow(QMainWindow):
         # Add other command-specific UI updates here if needed,
         # particularly those not covered by DataManager signals.
 
+    @pyqtSlot()
     def _handle_new_topic_action(self):
         if not self.data_manager:
             QMessageBox.information(self, "New Topic", "No collection is open.")
@@ -473,6 +721,7 @@ class MainWindow(QMainWindow):
         
         # For simplicity, new topics are created with default title and empty content initially.
         # A dialog could be shown here to get title/content from user.
+        from .commands.topic_commands import CreateTopicCommand
         cmd = CreateTopicCommand(
             data_manager=self.data_manager,
             parent_id=parent_id,
@@ -486,6 +735,7 @@ class MainWindow(QMainWindow):
             logger.error(f"Error executing New Topic command: {e}", exc_info=True)
             QMessageBox.critical(self, "Error", f"Could not create new topic: {e}")
 
+    @pyqtSlot(str)
     def handle_topic_selected(self, topic_id):
         if not self.data_manager:
             logger.warning("handle_topic_selected called but no collection is open.")
@@ -498,13 +748,24 @@ class MainWindow(QMainWindow):
            self.editor_widget.current_topic_id != topic_id and \
            self.editor_widget.is_dirty():
             logger.info(f"Switching topic: Forcing save for dirty topic {self.editor_widget.current_topic_id}.")
-            self.editor_widget.force_save_if_dirty(wait_for_completion=True) # Wait for save to finish
+            selected_before_save = self.tree_widget.get_selected_topic_id()
+            self._force_save_and_wait() # Wait for save to finish
+            # Events handled during the wait may have closed the collection or selected (and
+            # loaded) another topic; loading this one now would undo that.
+            if not self.data_manager:
+                logger.info(f"Topic {topic_id} not loaded: the collection was closed while saving.")
+                return
+            if self.tree_widget.get_selected_topic_id() != selected_before_save:
+                logger.info(f"Topic {topic_id} not loaded: the selection changed while saving.")
+                return
 
-        # Pass data_manager to load_topic_content
-        self.editor_widget.load_topic_content(topic_id, self.data_manager)
+        # Pass data_manager to load_topic_content; the tree already knows the title
+        self.editor_widget.load_topic_content(topic_id, self.data_manager,
+                                              self.tree_widget.model.title_for_id(topic_id))
         # The editor_widget.dirty_changed signal (emitted as False when new topic loads clean)
         # will call _update_window_title.
 
+    @pyqtSlot(str, str, str)
     def handle_topic_title_changed(self, topic_id, old_title, new_title): # Assuming old_title is now provided
         if not self.data_manager:
             logger.warning("handle_topic_title_changed called but no collection is open.")
@@ -515,6 +776,7 @@ class MainWindow(QMainWindow):
 
         logger.info(f"Topic title change requested - ID: {topic_id}, Old: '{old_title}', New: '{new_title}'")
         
+        from .commands.topic_commands import ChangeTopicTitleCommand
         cmd = ChangeTopicTitleCommand(
             data_manager=self.data_manager,
             topic_id=topic_id,
@@ -535,8 +797,7 @@ class MainWindow(QMainWindow):
             # Revert optimistic UI update in tree_widget if the command failed
             # This assumes the tree_widget.topic_title_changed signal (which calls this handler)
             # was emitted *after* the tree widget visually changed the title.
-            if hasattr(self.tree_widget, 'update_topic_item_title'):
-                 self.tree_widget.update_topic_item_title(topic_id, old_title)
+            self.tree_widget.update_topic_item_title(topic_id, old_title)
             
     # def save_current_topic_content(self, prompt_if_no_topic=True): # Manual save removed
     #     if not self.data_manager or not self.editor_widget.current_topic_id:
@@ -585,7 +846,10 @@ class MainWindow(QMainWindow):
         # to ensure the state being highlighted is the saved state.
         if self.editor_widget.is_dirty():
             logger.info(f"Extract text: Forcing save for parent topic {parent_topic_id} due to dirty state.")
-            self.editor_widget.force_save_if_dirty(wait_for_completion=True)
+            self._force_save_and_wait()
+            if not self.data_manager or self.editor_widget.current_topic_id != parent_topic_id:
+                logger.info(f"Extract text: collection or topic changed while saving {parent_topic_id}. Extraction aborted.")
+                return
             if self.editor_widget.is_dirty(): # If save failed
                  QMessageBox.warning(self, "Extract Text", "Failed to save the current topic. Extraction aborted.")
                  return
@@ -608,6 +872,7 @@ class MainWindow(QMainWindow):
             # If candidate_title is empty, custom_child_title remains None,
             # and DataManager will use the timestamp placeholder.
 
+        from .commands.topic_commands import ExtractTextCommand
         cmd = ExtractTextCommand(
             data_manager=self.data_manager,
             parent_topic_id=parent_topic_id,
@@ -618,11 +883,9 @@ class MainWindow(QMainWindow):
         )
         try:
             self.undo_manager.execute_command(cmd)
-            # UI updates (new topic in tree, highlighting in editor) will be handled by DataManager signals
-            # Potentially select the new child topic in the tree.
-            if cmd.child_topic_id: # Check if command execution was successful and child_topic_id is set
-                self.tree_widget.select_topic_item(cmd.child_topic_id)
-                self.handle_topic_selected(cmd.child_topic_id) # Load it in editor
+            # UI updates (new topic in tree, highlighting in editor) will be handled by DataManager signals.
+            # They are queued: _on_dm_topic_created adds, selects and loads the new child once
+            # control is back in the event loop, so it isn't selected here as well.
         except Exception as e:
             logger.error(f"Error executing Extract Text command: {e}", exc_info=True)
             QMessageBox.critical(self, "Extraction Error", f"Could not extract text: {e}")
@@ -630,7 +893,7 @@ class MainWindow(QMainWindow):
     # --- Settings Dialog and Handlers ---
 
     def open_settings_dialog(self):
-        dialog = SettingsDialog(self.data_manager, self)
+        dialog = SettingsDialog(self.data_manager, self, settings=self._settings)
         # Connect signals from the dialog to MainWindow handlers
         dialog.theme_changed.connect(self.handle_theme_changed)
         dialog.editor_font_changed.connect(self.handle_editor_font_changed)
@@ -653,10 +916,11 @@ class MainWindow(QMainWindow):
             logger.info("Settings dialog cancelled.")
             # Optionally, revert any previewed changes if the dialog supported live preview + cancel.
             # For this dialog, Apply or OK saves, Cancel discards.
+        self._settings_sync_timer.start() # Flush whatever Apply/OK wrote to the shared QSettings
 
     def _apply_initial_settings(self):
         logger.info("Applying initial settings...")
-        settings = QSettings(APP_ORGANIZATION_NAME, APP_NAME)
+        settings = self._settings
 
         theme = settings.value("ui/theme", "System Default")
         self.handle_theme_changed(theme)
@@ -685,6 +949,7 @@ class MainWindow(QMainWindow):
         # and don't require direct application to visual components here.
         logger.info("Initial settings applied.")
 
+    @pyqtSlot(str)
     def handle_theme_changed(self, theme_name: str):
         logger.info(f"Applying theme: {theme_name}")
         # Placeholder for theme application logic
@@ -712,30 +977,23 @@ class MainWindow(QMainWindow):
         QApplication.instance().setProperty("theme", theme_name) # Store for other components if needed
 
 
+    @pyqtSlot(str, int)
     def handle_editor_font_changed(self, font_family: str, font_size: int):
         logger.info(f"Applying editor font: {font_family}, {font_size}pt")
-        if self.editor_widget and hasattr(self.editor_widget, 'set_font'):
-            font = QFont(font_family, font_size)
-            self.editor_widget.set_font(font)
-        else:
-            logger.warning("Editor widget not available or does not support set_font.")
+        self.editor_widget.set_font(QFont(font_family, font_size))
 
+    @pyqtSlot(str, int)
     def handle_tree_font_changed(self, font_family: str, font_size: int):
         logger.info(f"Applying tree view font: {font_family}, {font_size}pt")
-        if self.tree_widget and hasattr(self.tree_widget, 'set_font'):
-            font = QFont(font_family, font_size)
-            self.tree_widget.set_font(font) # Assumes tree_widget has set_font
-        else:
-            logger.warning("Tree widget not available or does not support set_font.")
+        self.tree_widget.set_font(QFont(font_family, font_size))
 
+    @pyqtSlot(str)
     def handle_extraction_highlight_color_changed(self, color_str: str):
         logger.info(f"Applying extraction highlight color: {color_str}")
-        if self.editor_widget and hasattr(self.editor_widget, 'set_extraction_highlight_color'):
-            self.editor_widget.set_extraction_highlight_color(color_str)
-        else:
-            logger.warning("Editor widget not available or does not support set_extraction_highlight_color.")
+        self.editor_widget.set_extraction_highlight_color(color_str)
         # This color might also be needed by DataManager or other parts if they render highlights.
 
+    @pyqtSlot(str)
     def handle_log_level_changed(self, level_str: str):
         logger.info(f"Updating log level to: {level_str}")
         # Assuming setup_logging can be called again or there's a specific function to update level
@@ -754,6 +1012,7 @@ class MainWindow(QMainWindow):
             logger.error(f"Failed to update log level: {e}", exc_info=True)
 
 
+    @pyqtSlot(int)
     def handle_autosave_interval_changed(self, interval_minutes: int):
         logger.info(f"Updating autosave interval to: {interval_minutes} minutes")
         if self.autosave_timer.isActive():
@@ -769,188 +1028,208 @@ class MainWindow(QMainWindow):
             logger.info("Autosave disabled.")
 
     def _perform_autosave(self):
-        if self.data_manager and self.editor_widget and \
+        if self.data_manager and \
            self.editor_widget.current_topic_id and self.editor_widget.is_dirty():
             logger.info(f"Autosaving content for topic: {self.editor_widget.current_topic_id}")
             # Use the force_save_if_dirty method which encapsulates the save logic
-            self.editor_widget.force_save_if_dirty(wait_for_completion=False) # Non-blocking for autosave
+            self.editor_widget.force_save_if_dirty() # Saves in the background
         else:
             logger.info("Autosave triggered, but no dirty content to save or no topic open.")
 
     # --- DataManager Signal Handlers ---
 
+    @pyqtSlot(str, str, str, str)
     def _on_dm_topic_created(self, topic_id: str, parent_id: str, title: str, text_content: str):
-        logger.info(f"DM SIGNAL: Topic Created - ID: {topic_id}, Parent: {parent_id}, Title: '{title}'")
-        if self.tree_widget and hasattr(self.tree_widget, 'add_topic_item'):
-            self.tree_widget.add_topic_item(
-                topic_id=topic_id,
-                title=title,
-                parent_id=parent_id
-            )
-            # Optionally, select the new topic
-            self.tree_widget.select_topic_item(topic_id) # Assumes method exists
-            self.handle_topic_selected(topic_id) # To load it in editor
-        else:
-            logger.warning("Tree widget not available for UI update on topic_created.")
-
+        if self._bulk_depth: # The bulk refresh reloads the tree once afterwards
+            return
+        logger.info("DM SIGNAL: Topic Created - ID: %s, Parent: %s, Title: '%s'", topic_id, parent_id, title)
+        # Insert without touching the selection; selecting and loading the new topic waits
+        # until the current burst of creations (e.g., an import) is over, so only the last
+        # one is loaded into the editor.
+        self.tree_widget.add_topic_items([(topic_id, title, parent_id)])
+        self._created_topic_to_select = topic_id
+        self._created_selection_timer.start()
+
+    def _select_created_topic(self):
+        topic_id, self._created_topic_to_select = self._created_topic_to_select, None
+        if topic_id is None or not self.tree_widget.has_topic(topic_id):
+            return # Deleted again (or the collection closed) in the meantime
+        # Emits topic_selected once, which loads the topic into the editor; also expands its ancestors.
+        self.tree_widget.select_topic_item(topic_id)
+
+    @pyqtSlot(str, str)
     def _on_dm_topic_title_changed(self, topic_id: str, new_title: str):
-        logger.info(f"DM SIGNAL: Topic Title Changed - ID: {topic_id}, New Title: '{new_title}'")
-        if self.tree_widget and hasattr(self.tree_widget, 'update_topic_item_title'):
-            self.tree_widget.update_topic_item_title(topic_id, new_title)
-        else:
-            logger.warning("Tree widget not available for UI update on topic_title_changed.")
-        
-        if self.editor_widget and self.editor_widget.current_topic_id == topic_id:
+        if self._bulk_depth: # The bulk refresh reloads the tree once afterwards
+            return
+        logger.info("DM SIGNAL: Topic Title Changed - ID: %s, New Title: '%s'", topic_id, new_title)
+        self.tree_widget.update_topic_item_title(topic_id, new_title)
+
+        if self.editor_widget.current_topic_id == topic_id:
+            self.editor_widget.current_topic_title = new_title
             self._update_window_title() # Update title as current topic's name changed
 
+    @pyqtSlot(str)
     def _on_dm_topic_content_saved(self, topic_id: str):
-        logger.info(f"DM SIGNAL: Topic Content Saved - ID: {topic_id}")
-        if self.editor_widget.current_topic_id == topic_id:
-            self.editor_widget.mark_as_clean() # Update dirty status
+        logger.info("DM SIGNAL: Topic Content Saved - ID: %s", topic_id)
+        editor = self.editor_widget
+        if editor.current_topic_id == topic_id:
+            editor.mark_as_clean() # Update dirty status
             # Optionally, reload content if there's a chance it was modified externally
             # or if the save process itself normalizes content that should be re-shown.
             # For now, mark_as_saved is the primary action.
 
+    @pyqtSlot(str, str)
     def _on_dm_topic_deleted(self, deleted_topic_id: str, old_parent_id: str):
-        logger.info(f"DM SIGNAL: Topic Deleted - ID: {deleted_topic_id}, Old Parent: {old_parent_id}")
-        if self.editor_widget.current_topic_id == deleted_topic_id:
-            self.editor_widget.clear_content() # Clear editor if current topic deleted
-            self.editor_widget.current_topic_id = None # Reset current topic id
-
-        if self.tree_widget and hasattr(self.tree_widget, 'remove_topic_item'):
-            logger.info(f"_on_dm_topic_deleted: Found remove_topic_item. Calling it for {deleted_topic_id}.")
+        if self._bulk_depth: # The bulk refresh reloads the tree once afterwards
+            return
+        logger.info("DM SIGNAL: Topic Deleted - ID: %s, Old Parent: %s", deleted_topic_id, old_parent_id)
+        editor = self.editor_widget # Bound once; deletions arrive in bursts
+        current_topic_id = editor.current_topic_id
+        if current_topic_id == deleted_topic_id:
+            editor.clear_content() # Clear editor if current topic deleted
+            editor.current_topic_id = None # Reset current topic id
+        elif current_topic_id == old_parent_id:
+            # The editor shows the parent: drop the highlights of extractions that produced
+            # the deleted child. The editor knows which those are, so a plain child deletion
+            # (or one that was never extracted from this text) costs no queries or rehighlighting.
+            editor.remove_child_highlights(deleted_topic_id)
+
+        with self._tree_batch():
             self.tree_widget.remove_topic_item(deleted_topic_id)
-            logger.info(f"_on_dm_topic_deleted: Returned from remove_topic_item for {deleted_topic_id}.")
-        else:
-            logger.error(f"_on_dm_topic_deleted: remove_topic_item method NOT FOUND in tree_widget. Tree will NOT be updated for deletion of {deleted_topic_id}. Falling back to full reload.")
-            # Fallback to full reload if specific removal isn't available
-            if self.tree_widget and self.data_manager:
-                logger.info(f"_on_dm_topic_deleted: Attempting fallback: self.tree_widget.load_tree_data for {deleted_topic_id}")
-                self.tree_widget.load_tree_data(self.data_manager)
-                logger.info(f"_on_dm_topic_deleted: Fallback load_tree_data completed for {deleted_topic_id}")
-            else:
-                logger.error("_on_dm_topic_deleted: Cannot fallback to load_tree_data, tree_widget or data_manager is None.")
-        
-        # If the deleted topic was a child of the currently open topic in the editor,
-        # the parent topic's highlights might need refreshing (if it had extractions to the deleted child)
-        # This is a more complex scenario; for now, we rely on _apply_existing_highlights
-        # being called when a topic is loaded or an extraction is made/deleted directly affecting it.
-        # A simpler approach for now: if the editor shows the parent of the deleted topic, refresh its highlights.
-        if self.editor_widget.current_topic_id == old_parent_id:
-             if hasattr(self.editor_widget, '_apply_existing_highlights') and self.data_manager:
-                self.editor_widget._apply_existing_highlights(self.data_manager)
-
-
-    def _on_dm_extraction_created(self, extraction_id: str, parent_topic_id: str, child_topic_id: str, start_char: int, end_char: int):
-        logger.info(f"DM SIGNAL: Extraction Created - ID: {extraction_id} for Parent: {parent_topic_id}")
-        # The child topic itself is handled by _on_dm_topic_created.
-        # Here, we primarily care about updating the parent topic's view if it's currently open.
-        if self.editor_widget.current_topic_id == parent_topic_id:
-            if hasattr(self.editor_widget, '_apply_existing_highlights') and self.data_manager:
-                self.editor_widget._apply_existing_highlights(self.data_manager)
-            # Or, more targeted: self.editor_widget.apply_extraction_highlight(start_char, end_char)
-            # but _apply_existing_highlights is safer as it rebuilds all.
-        else:
-            logger.warning("Editor widget not showing parent of new extraction, or highlight method missing.")
-
-    def _on_dm_extraction_deleted(self, extraction_id: str, parent_topic_id: str):
-        logger.info(f"DM SIGNAL: Extraction Deleted - ID: {extraction_id} from Parent: {parent_topic_id}")
-        # If the parent topic whose extraction was removed is currently in the editor, refresh its highlights.
-        if self.editor_widget.current_topic_id == parent_topic_id:
-            if hasattr(self.editor_widget, '_apply_existing_highlights') and self.data_manager:
-                self.editor_widget._apply_existing_highlights(self.data_manager)
-        else:
-            logger.warning("Editor widget not showing parent of deleted extraction, or highlight method missing.")
 
+
+    @pyqtSlot(str, str, str, int)
     def _on_dm_topic_moved(self, topic_id: str, new_parent_id: str, old_parent_id: str, new_display_order: int):
-        logger.info(f"DM SIGNAL: Topic Moved - ID: {topic_id} to Parent: {new_parent_id}")
-        if self.tree_widget and hasattr(self.tree_widget, 'move_topic_item'):
-            self.tree_widget.move_topic_item(
-                topic_id=topic_id,
-                new_parent_id=new_parent_id,
-                # The tree widget might need to re-fetch children of old_parent_id and new_parent_id
-                # or have a more sophisticated move_topic_item that handles reordering.
-                # For now, we assume it can handle this or will be reloaded by data_changed_bulk if necessary.
-                new_display_order=new_display_order # Pass this along
-            )
-        else:
-            logger.warning("Tree widget not available for UI update on topic_moved.")
+        if self._bulk_depth: # The bulk refresh reloads the tree once afterwards
+            return
+        logger.info("DM SIGNAL: Topic Moved - ID: %s to Parent: %s", topic_id, new_parent_id)
+        # The tree widget always exists (asserted in __init__), so no per-call guard.
+        with self._tree_batch():
+            # With an unchanged parent this is a single-row reorder among the siblings.
+            self.tree_widget.move_topic_item(topic_id, new_parent_id, new_display_order, old_parent_id)
         # If the moved topic was open in the editor, its context (parent) changed.
         # No direct editor update needed unless it affects breadcrumbs or similar.
 
+    @pyqtSlot()
     def _on_dm_data_changed_bulk(self):
         """Handles a signal indicating a larger, non-specific change, often requiring a full UI refresh."""
-        logger.info("DM SIGNAL: Bulk Data Change. Reloading tree data.")
-        if self.data_manager and self.tree_widget:
-            self.tree_widget.load_tree_data(self.data_manager)
-            # Current topic in editor might become invalid or its content stale.
-            # Consider reloading or clearing it.
-            current_editor_topic = self.editor_widget.current_topic_id
-            if current_editor_topic:
-                # Check if topic still exists
-                if self.data_manager.get_topic_details(current_editor_topic):
-                    self.editor_widget.load_topic_content(current_editor_topic, self.data_manager)
-                else:
-                    self.editor_widget.clear_content()
-                    self.editor_widget.current_topic_id = None
+        logger.info("DM SIGNAL: Bulk Data Change. Scheduling tree refresh.")
+        # Restarting the single-shot timer folds a burst of bulk signals into one refresh.
+        self._bulk_refresh_timer.start()
+
+    def _do_bulk_refresh(self):
+        logger.info("Bulk refresh: Syncing tree data.")
+        self._invalidate_current_topic_title() # Titles may have changed without per-topic signals
+        if not self.data_manager:
+            return
+        self._bulk_depth += 1
+        try:
+            with self._tree_batch():
+                self.tree_widget.sync_tree_data(self.data_manager)
+        finally:
+            self._bulk_depth -= 1
+        # Current topic in editor might become invalid or its content stale.
+        # Consider reloading or clearing it.
+        current_editor_topic = self.editor_widget.current_topic_id
+        if current_editor_topic:
+            # The tree was just synced with the database, so it knows whether the topic still exists
+            if self.tree_widget.has_topic(current_editor_topic):
+                self.editor_widget.load_topic_content(current_editor_topic, self.data_manager,
+                                                      self.tree_widget.model.title_for_id(current_editor_topic))
             else:
                 self.editor_widget.clear_content()
+                self.editor_widget.current_topic_id = None
+
+
+    def _on_unsaved_close_reply(self, reply):
+        if reply == QMessageBox.StandardButton.Yes:
+            logger.info("Application close: Closing despite unsaved changes, as confirmed by the user.")
+            self._force_close = True
+            self.close()
+        else:
+            logger.info("Application close: Cancelled by the user because of unsaved changes.")
 
+    def _save_window_state(self):
+        """Stores the window geometry and splitter sizes, restored by the next __init__."""
+        self._settings.setValue("geometry", self.saveGeometry())
+        self._settings.setValue("splitterState", self.splitter.saveState())
 
     def closeEvent(self, event):
         logger.info("Application close event triggered.")
+
+        # Nothing open and nothing being opened: no topic to save, no collection to close and
+        # no background work to wait for. A pending open takes the full path below instead.
+        if not self.data_manager and not self.active_collection_path and self._init_task is None:
+            self._save_last_collection_path(None)
+            self._save_window_state()
+            super().closeEvent(event)
+            return
         
         # Step 1: Handle unsaved changes in the currently active editor
-        # This check needs to be robust: ensure editor_widget and current_topic_id exist.
-        if self.data_manager and \
-           self.editor_widget and \
+        # Skipped when the user already chose to close anyway (see _on_unsaved_close_reply).
+        if not self._force_close and \
+           self.data_manager and \
            self.editor_widget.current_topic_id and \
            self.editor_widget.is_dirty():
             
             logger.info(f"Application close: Current editor for topic {self.editor_widget.current_topic_id} is dirty. Attempting to save.")
-            self.editor_widget.force_save_if_dirty(wait_for_completion=True) # Blocking save
+            # Save on the editor's worker thread behind a modal busy dialog, so the window
+            # keeps repainting (and isn't flagged "Not Responding") on a slow disk.
+            progress = QProgressDialog("Saving changes...", None, 0, 0, self)
+            progress.setWindowTitle(APP_NAME)
+            progress.setWindowModality(Qt.WindowModality.ApplicationModal)
+            progress.setCancelButton(None)
+            progress.setMinimumDuration(0)
+            progress.show()
+            try:
+                self._force_save_and_wait()
+            finally:
+                progress.close()
+                progress.deleteLater()
             
             if self.editor_widget.is_dirty(): # Check if save failed
-                topic_title_for_msg = self.editor_widget.current_topic_id # Fallback title
-                # Try to get a more user-friendly title
-                if self.data_manager: # Check if data_manager is still valid
-                    details = self.data_manager.get_topic_details(self.editor_widget.current_topic_id)
-                    if details and details.get('title'):
-                        topic_title_for_msg = details['title']
+                # Same lookup the window title uses: cached, from the tree, DB only as a last resort
+                topic_id = self.editor_widget.current_topic_id
+                topic_title_for_msg = self._get_current_topic_title(topic_id) or topic_id
                 
-                reply = QMessageBox.warning(
-                    self, "Unsaved Changes",
+                # Asked without a nested event loop: the close is refused for now and
+                # _on_unsaved_close_reply closes the window again if the user says Yes.
+                box = QMessageBox(
+                    QMessageBox.Icon.Warning, "Unsaved Changes",
                     f"Could not save changes for topic '{topic_title_for_msg}'.\n"
                     "Do you want to close anyway and lose these changes?",
                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                    QMessageBox.StandardButton.No # Default to No
+                    self
                 )
-                if reply == QMessageBox.StandardButton.No:
-                    event.ignore() # User chose not to close
-                    return
+                box.setDefaultButton(QMessageBox.StandardButton.No)
+                box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+                box.buttonClicked.connect(lambda button: self._on_unsaved_close_reply(box.standardButton(button)))
+                box.open()
+                event.ignore()
+                return
         
-        # Step 2: Store the path of the collection that was active *before* _handle_close_collection
-        collection_path_at_start_of_close = self.active_collection_path
-
-        # Step 3: Perform standard operations for closing a collection, if one is managed.
-        # _handle_close_collection itself calls force_save_if_dirty for the current editor,
-        # but the above block is a more explicit primary check for the app closing sequence.
-        # _handle_close_collection will also set self.active_collection_path to None
-        # and call _save_last_collection_path(None).
+        # Step 2: Remember the collection that was active (or still being opened) when the app
+        # started closing, so it is reopened on the next start.
+        if self._init_task is not None:
+            self._save_last_collection_path(self._init_task.collection_path)
+        else:
+            self._save_last_collection_path(self.active_collection_path)
+        self._save_window_state()
+
+        # Step 3: Perform standard operations for closing a collection, if one is managed,
+        # leaving the setting written above in place. Step 1 already saved the editor, or
+        # the user chose to close without its changes, so it isn't saved again here.
         if self.data_manager:
-            self._handle_close_collection()
+            self._close_collection(forget_last_collection=False, save_dirty_topic=False)
 
-        # Step 4: Determine the final "last_opened_collection" path to persist.
-        # If a collection was active when the application started to close (before _handle_close_collection),
-        # save its path. This overrides the None potentially set by _handle_close_collection.
-        if collection_path_at_start_of_close:
-            self._save_last_collection_path(collection_path_at_start_of_close)
-        else:
-            # If no collection was active at the start of closeEvent, or if _handle_close_collection
-            # wasn't called (because no data_manager), ensure the setting is cleared.
-            self._save_last_collection_path(None)
-            
-        # Step 5: Proceed with closing the application
+        # Step 4: Let background work on the thread pool (saves, a collection being opened) finish.
+        QThreadPool.globalInstance().waitForDone()
+
+        # Step 5: Write the settings out once, now, rather than leaving it to QSettings' destructor.
+        self._settings_sync_timer.stop()
+        self._settings.sync()
+
+        # Step 6: Proceed with closing the application
         super().closeEvent(event)
 
 
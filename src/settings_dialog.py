@@ -10,6 +10,9 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtGui import QFont, QFontDatabase, QKeySequence
 from .data_manager import DataManager
 
+APP_ORGANIZATION_NAME = "IromoOrg" # For QSettings
+APP_NAME = "Iromo" # For QSettings
+
 
 class SettingsDialog(QDialog):
     # Signals for settings changes
@@ -26,10 +29,13 @@ class SettingsDialog(QDialog):
     show_welcome_on_startup_changed = pyqtSignal(bool)
     log_level_changed = pyqtSignal(str)
 
-    def __init__(self, data_manager: DataManager, parent=None):
+    def __init__(self, data_manager: DataManager, parent=None, settings: QSettings = None):
         super().__init__(parent)
         self.data_manager = data_manager
-        self.settings = QSettings("IromoProject", "Iromo")
+        # The owner's QSettings when given, so the dialog reads and writes the same store
+        # the application applies at startup instead of constructing (and parsing) its own.
+        # Otherwise the same store is opened by name.
+        self.settings = settings if settings is not None else QSettings(APP_ORGANIZATION_NAME, APP_NAME)
         self.autosave_values = [0, 1, 2, 5, 10, 15, 30] # Corresponds to autosave_interval_combo items
 
         self.setWindowTitle("Settings")
@@ -4,9 +4,10 @@ import re # For placeholder title detection
 import shutil # For __main__ test cleanup
 import datetime # For __main__ test
 
-from PyQt6.QtCore import pyqtSignal, QUrl, QThread, QObject # Removed QTimer
+from PyQt6.QtCore import pyqtSignal, pyqtSlot, QUrl, QObject, QRunnable, Qt, QThreadPool, QTimer
 from PyQt6.QtGui import (
     QAction,
+    QBrush,
     QColor,
     QFont,
     QKeySequence,
@@ -23,47 +24,56 @@ from .data_manager import DataManager # Import the DataManager class
 
 logger = logging.getLogger(__name__)
 
-# Worker for background saving
-class SaveWorker(QObject):
-    finished = pyqtSignal()
+class SaveTaskSignals(QObject):
+    """Signals of a SaveTask (QRunnable isn't a QObject, so it can't declare its own)."""
     error = pyqtSignal(str)
     success = pyqtSignal(str) # Emits the saved content
 
+# Background save, run on QThreadPool.globalInstance() so saves reuse pooled threads
+# instead of starting a QThread each.
+class SaveTask(QRunnable):
     def __init__(self, data_manager, topic_id, content_to_save):
         super().__init__()
+        self.setAutoDelete(False) # The editor holds on to the task until its result is handled
         self.data_manager = data_manager
         self.topic_id = topic_id
         self.content_to_save = content_to_save
+        self.signals = SaveTaskSignals()
 
     def run(self):
         try:
             if self.data_manager and self.topic_id:
-                logger.info(f"SaveWorker: Saving content for topic {self.topic_id} in background thread.")
+                logger.info(f"SaveTask: Saving content for topic {self.topic_id} in background thread.")
                 self.data_manager.save_topic_content(self.topic_id, self.content_to_save)
-                self.success.emit(self.content_to_save)
+                self.signals.success.emit(self.content_to_save)
             else:
-                raise ValueError("DataManager or Topic ID not provided to SaveWorker.")
+                raise ValueError("DataManager or Topic ID not provided to SaveTask.")
         except Exception as e:
-            logger.error(f"SaveWorker: Error saving topic {self.topic_id}: {e}", exc_info=True)
-            self.error.emit(str(e))
-        finally:
-            self.finished.emit()
+            logger.error(f"SaveTask: Error saving topic {self.topic_id}: {e}", exc_info=True)
+            self.signals.error.emit(str(e))
 
 
 class TopicEditorWidget(QWidget): # Changed from QTextEdit to QWidget
     content_changed_externally = pyqtSignal() # Emitted if content is changed by an external action (e.g. undo/redo of save)
     dirty_changed = pyqtSignal(bool) # Emitted when the dirty state changes
+    save_finished = pyqtSignal() # Emitted on the UI thread once a background save has been handled
     # AUTO_SAVE_INTERVAL = 2000 # milliseconds (2 seconds) # REMOVED
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_topic_id = None
+        self.current_topic_title = None # Title of current_topic_id as of loading; kept up to date by the owner
         self.data_manager = None # Store DataManager instance
         self.original_content = "" # Stores the content as it was when loaded or last saved
         self._is_dirty = False      # True if content has changed since last load/save
-        self.save_thread = None
-        self.save_worker = None
+        self.save_task = None # SaveTask whose result hasn't been handled yet
         self._extraction_highlight_color = QColor("#A7D8DE") # Default highlight color
+        self._highlight_ranges = {} # extraction_id -> (start_char, end_char) highlighted in the current topic
+        self._highlight_children = {} # extraction_id -> child_topic_id, for the same extractions
+        # Extraction highlight changes waiting to be applied: extraction_id -> (start_char,
+        # end_char, child_topic_id) to add, or None to remove. See queue_extraction_highlight().
+        self._pending_highlight_changes = {}
+        self._highlight_flush_scheduled = False
 
         self._setup_ui()
         # self._setup_auto_save_timer() # REMOVED
@@ -218,8 +228,8 @@ class TopicEditorWidget(QWidget): # Changed from QTextEdit to QWidget
             # No need to explicitly set _is_dirty = True, as _on_text_changed will do it.
 
         # Clean up references
-        self.save_thread = None
-        self.save_worker = None
+        self.save_task = None
+        self.save_finished.emit()
 
 
     def _handle_save_failure(self, error_message: str):
@@ -227,8 +237,8 @@ class TopicEditorWidget(QWidget): # Changed from QTextEdit to QWidget
         # Decide on error handling: maybe a status bar message, or keep dirty flag
         # For now, we keep it dirty, so the next change or manual action might retry.
         # Clean up references
-        self.save_thread = None
-        self.save_worker = None
+        self.save_task = None
+        self.save_finished.emit()
 
 
     # --- Formatting Action Handlers ---
@@ -324,8 +334,11 @@ class TopicEditorWidget(QWidget): # Changed from QTextEdit to QWidget
         text = doc.toPlainText()
         return text.replace('\n', '\\n')[:100]
 
-    def load_topic_content(self, topic_id: str, data_manager_instance: DataManager):
-        """Loads and displays the content for the given topic_id using the provided DataManager."""
+    def load_topic_content(self, topic_id: str, data_manager_instance: DataManager, title: str | None = None):
+        """
+        Loads and displays the content for the given topic_id using the provided DataManager.
+        title, if the caller knows it, is kept as current_topic_title.
+        """
         logger.info(f"Loading content for topic_id: {topic_id}")
         self.clear_content() # Clear previous content and highlights, sets placeholder
 
@@ -339,6 +352,7 @@ class TopicEditorWidget(QWidget): # Changed from QTextEdit to QWidget
         content = self.data_manager.get_topic_content(topic_id)
         if content is not None:
             self.current_topic_id = topic_id
+            self.current_topic_title = title
             self.original_content = content # Store original content
             logger.debug(f"TopicEditorWidget: Content for topic {topic_id} before setHtml: '{content[:500]}'") # Log first 500 chars
             self.editor.setHtml(content) # Render content as HTML
@@ -379,7 +393,7 @@ class TopicEditorWidget(QWidget): # Changed from QTextEdit to QWidget
             start_char = extr['parent_text_start_char']
             end_char = extr['parent_text_end_char']
             logger.debug(f"Applying highlight {i+1}/{len(extractions)}: start={start_char}, end={end_char}")
-            self.apply_extraction_highlight(start_char, end_char)
+            self.apply_extraction_highlight(start_char, end_char, extr['id'], extr['child_topic_id'])
 
     def get_current_content(self):
         return self.editor.toHtml() # Return HTML content
@@ -395,7 +409,7 @@ class TopicEditorWidget(QWidget): # Changed from QTextEdit to QWidget
         
         return selected_text, start_offset, end_offset - 1 # end_offset is exclusive, so -1 for inclusive
 
-    def apply_extraction_highlight(self, start_char, end_char):
+    def apply_extraction_highlight(self, start_char, end_char, extraction_id=None, child_topic_id=None):
         doc_text_before_highlight = self._get_document_text_for_logging()
         doc_len = len(self.editor.toPlainText()) # Use self.editor
         logger.debug(f"apply_extraction_highlight: START. For topic {self.current_topic_id}. Input start={start_char}, end={end_char}. Doc len: {doc_len}. Doc text: '{doc_text_before_highlight}'")
@@ -431,21 +445,121 @@ class TopicEditorWidget(QWidget): # Changed from QTextEdit to QWidget
         char_format.setForeground(QColor("black")) # Set text color to black
         cursor.mergeCharFormat(char_format)
         logger.debug(f"apply_extraction_highlight: Char format merged with background {highlight_color.name()}.")
+        if extraction_id is not None:
+            self._highlight_ranges[extraction_id] = (start_char, end_char)
+            if child_topic_id is not None:
+                self._highlight_children[extraction_id] = child_topic_id
         
         final_cursor_pos = cursor.selectionEnd()
         cursor.clearSelection()
         cursor.setPosition(final_cursor_pos)
         self.editor.setTextCursor(cursor) # Use self.editor
 
+    def remove_extraction_highlight(self, extraction_id) -> bool:
+        """
+        Clears the highlight of a single extraction, re-applying any other highlight that
+        overlaps it. Returns False if the extraction isn't highlighted in this topic, in
+        which case the caller should rebuild all highlights instead.
+        """
+        highlight = self._highlight_ranges.pop(extraction_id, None)
+        self._highlight_children.pop(extraction_id, None)
+        if highlight is None:
+            return False
+        start_char, end_char = highlight
+        doc_len = len(self.editor.toPlainText())
+        # A document cursor, so the user's cursor and selection stay where they are
+        cursor = QTextCursor(self.editor.document())
+        cursor.setPosition(min(start_char, doc_len))
+        cursor.setPosition(min(end_char + 1, doc_len), QTextCursor.MoveMode.KeepAnchor)
+        char_format = QTextCharFormat()
+        char_format.setBackground(QBrush(Qt.BrushStyle.NoBrush))
+        cursor.mergeCharFormat(char_format)
+        logger.debug(f"remove_extraction_highlight: Cleared highlight of extraction {extraction_id} ({start_char}-{end_char}).")
+
+        for other_id, (other_start, other_end) in list(self._highlight_ranges.items()):
+            if other_start <= end_char and other_end >= start_char:
+                self.apply_extraction_highlight(other_start, other_end, other_id)
+        return True
+
+    # DataManager.extraction_created/extraction_deleted are connected straight to these two
+    # slots by MainWindow; extractions of topics other than the open one are ignored.
+
+    @pyqtSlot(str, str, str, int, int)
+    def on_extraction_created(self, extraction_id: str, parent_topic_id: str, child_topic_id: str, start_char: int, end_char: int):
+        logger.debug("Extraction created - ID: %s for Parent: %s", extraction_id, parent_topic_id)
+        if parent_topic_id == self.current_topic_id:
+            self.queue_extraction_highlight(extraction_id, start_char, end_char, child_topic_id)
+
+    @pyqtSlot(str, str)
+    def on_extraction_deleted(self, extraction_id: str, parent_topic_id: str):
+        logger.debug("Extraction deleted - ID: %s from Parent: %s", extraction_id, parent_topic_id)
+        if parent_topic_id == self.current_topic_id:
+            self.queue_extraction_highlight_removal(extraction_id)
+
+    def queue_extraction_highlight(self, extraction_id, start_char, end_char, child_topic_id=None):
+        """
+        Highlights a new extraction of the current topic once control returns to the event
+        loop, so a burst of extraction changes is applied in one pass.
+        """
+        self._pending_highlight_changes[extraction_id] = (start_char, end_char, child_topic_id)
+        self._schedule_highlight_flush()
+
+    def queue_extraction_highlight_removal(self, extraction_id):
+        """Counterpart of queue_extraction_highlight() for a deleted extraction."""
+        if self._pending_highlight_changes.pop(extraction_id, None) is not None:
+            return # Created and deleted before it was ever highlighted
+        self._pending_highlight_changes[extraction_id] = None
+        self._schedule_highlight_flush()
+
+    def _schedule_highlight_flush(self):
+        if not self._highlight_flush_scheduled:
+            self._highlight_flush_scheduled = True
+            QTimer.singleShot(0, self._flush_highlight_changes)
+
+    def _flush_highlight_changes(self):
+        """Applies the queued highlight changes; rebuilds from the database at most once, if a removal can't be applied."""
+        self._highlight_flush_scheduled = False
+        changes, self._pending_highlight_changes = self._pending_highlight_changes, {}
+        rebuild = False
+        for extraction_id, change in changes.items():
+            if change is None:
+                if not self.remove_extraction_highlight(extraction_id):
+                    rebuild = True
+            else:
+                start_char, end_char, child_topic_id = change
+                self.apply_extraction_highlight(start_char, end_char, extraction_id, child_topic_id)
+        if rebuild and self.data_manager:
+            self._apply_existing_highlights(self.data_manager)
+
+    def remove_child_highlights(self, child_topic_id) -> bool:
+        """
+        Clears the highlights of extractions that produced child_topic_id, e.g. after that
+        child was deleted. Returns True if any highlight was removed.
+        """
+        extraction_ids = [extraction_id for extraction_id, child_id in self._highlight_children.items()
+                          if child_id == child_topic_id]
+        for extraction_id in extraction_ids:
+            self.remove_extraction_highlight(extraction_id)
+        return bool(extraction_ids)
+
     def clear_content(self):
         """Clears the editor, resets current_topic_id, and sets placeholder text."""
+        self.data_manager = None # Clear stored DataManager
+        self.current_topic_title = None
+        self._highlight_ranges = {}
+        self._highlight_children = {}
+        self._pending_highlight_changes = {} # They were for the topic being cleared
+        if self.current_topic_id is None and not self._is_dirty and self.editor.document().isEmpty():
+            # Already empty: skip clear(), which would still run the textChanged handling
+            self.editor.setPlaceholderText("Select a topic to view or edit its content, or open a collection.")
+            self.action_open_file.setEnabled(False)
+            return
         self.current_topic_id = None
         self.editor.clear() # Use self.editor
         self.editor.setPlaceholderText("Select a topic to view or edit its content, or open a collection.") # Use self.editor
         self.original_content = ""
         self.mark_as_clean()
         self.action_open_file.setEnabled(False) # Disable button
-        self.data_manager = None # Clear stored DataManager
 
     # _handle_text_changed is now part of _on_text_changed_for_auto_save
     # def _handle_text_changed(self):
@@ -514,74 +628,37 @@ class TopicEditorWidget(QWidget): # Changed from QTextEdit to QWidget
                 return False
         return False
 
-    def force_save_if_dirty(self, wait_for_completion=False):
+    def force_save_if_dirty(self):
         """
-        If the content is dirty, triggers an immediate save.
+        If the content is dirty, triggers an immediate save in the background.
         Optionally updates placeholder title before saving.
-        If wait_for_completion is True, this method will block until the save is done.
-        Otherwise, it will attempt to save in the background.
+        Returns the SaveTask doing the save (possibly one already in progress), whose
+        completion is announced by save_finished; callers that must block until the
+        content is stored wait on that signal. Returns None when there is nothing to wait for.
         """
         if not self._is_dirty or not self.current_topic_id or not self.data_manager:
             logger.debug(f"Force save called for {self.current_topic_id}, but not dirty or no topic/DM. Skipping.")
-            return
+            return None
 
         # If we are proceeding to save because it's dirty, then check and update title.
         self._check_and_update_placeholder_title()
         # If title was updated, DataManager.update_topic_title was called.
         # The main window (KnowledgeTreeWidget) should observe DataManager signals for topic changes.
 
-        logger.info(f"Force saving content for topic {self.current_topic_id} (wait_for_completion={wait_for_completion}). Dirty: {self._is_dirty}")
-        content_to_save = self.editor.toHtml()
+        logger.info(f"Force saving content for topic {self.current_topic_id}. Dirty: {self._is_dirty}")
 
-        if self.save_thread and self.save_thread.isRunning():
-            logger.warning(f"Force save for {self.current_topic_id}: A save operation is already in progress.")
-            if wait_for_completion:
-                logger.info(f"Waiting for existing save thread to complete for topic {self.current_topic_id}.")
-                self.save_thread.wait() # Wait for the existing thread to finish
-                # After waiting, the content might have been saved by the other thread, making it clean.
-                # The title update (if applicable for *this* call's context) has already been attempted.
-                if not self._is_dirty: # Check current dirty state after wait
-                    logger.info(f"Force save for {self.current_topic_id}: Content became clean while waiting for another save. Skipping further content save in this call.")
-                    return # Content is clean, title (if placeholder) was already processed.
-                logger.info(f"Force save for {self.current_topic_id}: Content still dirty after waiting. Proceeding with current save.")
-            else: # not wait_for_completion
-                logger.info(f"Force save for {self.current_topic_id}: Save in progress, and not waiting. Skipping this save trigger.")
-                return
-        
-        # If, after all checks and potential waits, the content is no longer dirty,
-        # we might not need to save the content. The title update (if any) has already occurred.
-        if not self._is_dirty:
-            logger.info(f"Force save for {self.current_topic_id}: Content is no longer dirty (e.g. saved by waited thread, or was never dirty enough for this stage). Skipping content save.")
-            return
-
-        if wait_for_completion:
-            try:
-                logger.info(f"Force save (blocking) for topic {self.current_topic_id}.")
-                self.data_manager.save_topic_content(self.current_topic_id, content_to_save)
-                self._handle_save_success(content_to_save)
-            except Exception as e:
-                logger.error(f"Force save (blocking) for topic {self.current_topic_id} failed: {e}", exc_info=True)
-                self._handle_save_failure(str(e))
-        else:
-            # Background save logic
-            logger.info(f"Force save (background) for topic {self.current_topic_id} initiated.")
-            # Ensure no other save thread from this editor instance is running
-            if self.save_thread and self.save_thread.isRunning():
-                 logger.warning(f"Background save for {self.current_topic_id}: Previous save worker from this editor instance still active. Skipping new background save.")
-                 return
+        if self.save_task is not None:
+            logger.info(f"Force save for {self.current_topic_id}: Save in progress, not starting another.")
+            return self.save_task
 
-            self.save_thread = QThread(self)
-            self.save_worker = SaveWorker(self.data_manager, self.current_topic_id, content_to_save)
-            self.save_worker.moveToThread(self.save_thread)
-
-            self.save_worker.success.connect(self._handle_save_success)
-            self.save_worker.error.connect(self._handle_save_failure)
-            self.save_worker.finished.connect(self.save_thread.quit)
-            self.save_worker.finished.connect(self.save_worker.deleteLater)
-            self.save_thread.finished.connect(self.save_thread.deleteLater)
-            self.save_thread.finished.connect(lambda: setattr(self, 'save_thread', None)) # Clear self.save_thread
-            self.save_thread.started.connect(self.save_worker.run)
-            self.save_thread.start()
+        content_to_save = self.editor.toHtml()
+        logger.info(f"Force save (background) for topic {self.current_topic_id} initiated.")
+        self.save_task = SaveTask(self.data_manager, self.current_topic_id, content_to_save)
+        # Queued: the handlers run on this thread, which also clears save_task
+        self.save_task.signals.success.connect(self._handle_save_success, Qt.ConnectionType.QueuedConnection)
+        self.save_task.signals.error.connect(self._handle_save_failure, Qt.ConnectionType.QueuedConnection)
+        QThreadPool.globalInstance().start(self.save_task)
+        return self.save_task
 
     def mark_as_saved(self, saved_content: str):
         """
@@ -612,7 +689,7 @@ class TopicEditorWidget(QWidget): # Changed from QTextEdit to QWidget
                 super().focusOutEvent(event)
                 return
 
-        self.force_save_if_dirty(wait_for_completion=False) # Non-blocking save
+        self.force_save_if_dirty() # Saves in the background
         super().focusOutEvent(event) # Call base class implementation
     def mark_as_clean(self):
         """Resets the dirty flag and emits the dirty_changed signal if state changes."""
@@ -641,83 +718,17 @@ class TopicEditorWidget(QWidget): # Changed from QTextEdit to QWidget
         # self.editor.setCurrentCharFormat(char_format) # Ensure new typing uses this font
 
     def set_extraction_highlight_color(self, color_str: str):
-        """Sets the color used for extraction highlights."""
-        # This method would store the color. The actual application of the color
-        # happens in _apply_existing_highlights and apply_extraction_highlight.
-        # We need to decide if changing this should re-apply all highlights.
-        # For now, let's assume apply_extraction_highlight will use a fixed color
-        # or a color fetched from settings/property at the time of highlighting.
-        # If we want dynamic re-coloring, _apply_existing_highlights would need to be
-        # called after this, and apply_extraction_highlight would need to use the new color.
-        
-        # For simplicity, let's assume apply_extraction_highlight uses a hardcoded color for now,
-        # and this setting would be used if we refactor it to be dynamic.
-        # Or, we can update a property here that apply_extraction_highlight reads.
+        """Sets the color used for extraction highlights and recolors the ones already shown."""
         try:
             self._extraction_highlight_color = QColor(color_str)
             logger.info(f"Extraction highlight color set to: {color_str}")
-            # If content is loaded and has highlights, re-apply them with the new color
-            if self.current_topic_id and self.data_manager:
-                self._apply_existing_highlights(self.data_manager) # This will use the new color if apply_extraction_highlight is adapted
         except Exception as e:
             logger.error(f"Invalid color string for extraction highlight: {color_str}. Error: {e}")
             self._extraction_highlight_color = QColor("#A7D8DE") # Fallback to default
-
-
-    # In apply_extraction_highlight, change:
-    # highlight_color = QColor("#A7D8DE") # Fixed light teal color
-    # TO:
-    # highlight_color = getattr(self, '_extraction_highlight_color', QColor("#A7D8DE"))
-
-    # Make sure to initialize _extraction_highlight_color in __init__
-    # self._extraction_highlight_color = QColor("#A7D8DE") # Default
-
-    def set_font(self, font: QFont):
-        """Sets the font for the editor."""
-        self.editor.setFont(font)
-        # If you want to apply this font to existing content, you might need to iterate or select all and apply.
-        # For now, this will affect new text and potentially the default for unformatted existing text.
-        # To apply to all existing content:
-        # cursor = self.editor.textCursor()
-        # cursor.select(QTextCursor.SelectionType.Document)
-        # char_format = QTextCharFormat()
-        # char_format.setFont(font)
-        # cursor.mergeCharFormat(char_format)
-        # cursor.clearSelection()
-        # self.editor.setTextCursor(cursor)
-        # self.editor.setCurrentCharFormat(char_format) # Ensure new typing uses this font
-
-    def set_extraction_highlight_color(self, color_str: str):
-        """Sets the color used for extraction highlights."""
-        # This method would store the color. The actual application of the color
-        # happens in _apply_existing_highlights and apply_extraction_highlight.
-        # We need to decide if changing this should re-apply all highlights.
-        # For now, let's assume apply_extraction_highlight will use a fixed color
-        # or a color fetched from settings/property at the time of highlighting.
-        # If we want dynamic re-coloring, _apply_existing_highlights would need to be
-        # called after this, and apply_extraction_highlight would need to use the new color.
-        
-        # For simplicity, let's assume apply_extraction_highlight uses a hardcoded color for now,
-        # and this setting would be used if we refactor it to be dynamic.
-        # Or, we can update a property here that apply_extraction_highlight reads.
-        try:
-            self._extraction_highlight_color = QColor(color_str)
-            logger.info(f"Extraction highlight color set to: {color_str}")
-            # If content is loaded and has highlights, re-apply them with the new color
-            if self.current_topic_id and self.data_manager:
-                self._apply_existing_highlights(self.data_manager) # This will use the new color if apply_extraction_highlight is adapted
-        except Exception as e:
-            logger.error(f"Invalid color string for extraction highlight: {color_str}. Error: {e}")
-            self._extraction_highlight_color = QColor("#A7D8DE") # Fallback to default
-
-
-    # In apply_extraction_highlight, change:
-    # highlight_color = QColor("#A7D8DE") # Fixed light teal color
-    # TO:
-    # highlight_color = getattr(self, '_extraction_highlight_color', QColor("#A7D8DE"))
-
-    # Make sure to initialize _extraction_highlight_color in __init__
-    # self._extraction_highlight_color = QColor("#A7D8DE") # Default
+        # The highlighted ranges are known, so recolor them without asking the database again.
+        # Queued ones pick up the new color when they are applied.
+        for extraction_id, (start_char, end_char) in list(self._highlight_ranges.items()):
+            self.apply_extraction_highlight(start_char, end_char, extraction_id)
 
 
 if __name__ == '__main__':
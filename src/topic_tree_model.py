@@ -0,0 +1,486 @@
+import logging
+
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# Role under which each index exposes its topic_id. Resolved to a plain int once so
+# hot paths (load, selection, delete) skip the enum wrapper lookup on every call.
+_TOPIC_ID_ROLE = Qt.ItemDataRole.UserRole.value
+_DISPLAY_ROLE = Qt.ItemDataRole.DisplayRole.value
+_EDIT_ROLE = Qt.ItemDataRole.EditRole.value
+
+_NO_PARENT = -1
+
+
+class TopicTreeModel(QAbstractItemModel):
+    """
+    Single-column item model for the knowledge tree.
+
+    Topics are stored in parallel lists indexed by an integer node number rather than
+    as one QStandardItem per topic, so index(), parent(), rowCount() and data() are
+    plain list/dict lookups and loading a collection is a single model reset.
+    Node numbers are only stable until the next reset; removed topics leave a hole
+    behind instead of renumbering every other node.
+    """
+    # Emitted when the user edits a title inline: topic_id, old_title, new_title
+    title_edited = pyqtSignal(str, str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._header_label = 'Topic Title'
+        self._placeholder_text = None # Shown as a single disabled row while there are no topics
+        self._reset_storage()
+
+    def _reset_storage(self):
+        self._ids: list[str] = []
+        self._titles: list[str] = []
+        self._parent: list[int] = [] # Parent node number, or _NO_PARENT for roots
+        self._children: list[list[int]] = [] # Child node numbers, in display order
+        self._pos: list[int] = [] # Row of each node within its parent's child list
+        self._refs: list[int] = [] # Objects handed to createIndex(); kept alive here
+        self._roots: list[int] = []
+        self._id_to_row: dict[str, int] = {}
+
+    # --- Internal helpers ---
+
+    def _new_node(self, topic_id: str, title: str, parent_node: int) -> int:
+        node = len(self._ids)
+        self._ids.append(topic_id)
+        self._titles.append(title)
+        self._parent.append(parent_node)
+        self._children.append([])
+        self._pos.append(0)
+        self._refs.append(node)
+        self._id_to_row[topic_id] = node
+        return node
+
+    def _child_list(self, parent_node: int) -> list[int]:
+        return self._roots if parent_node == _NO_PARENT else self._children[parent_node]
+
+    def _node(self, index: QModelIndex):
+        """Returns the node number behind a valid index, or None for the root/placeholder."""
+        if not index.isValid():
+            return None
+        return index.internalPointer()
+
+    def _index_for_node(self, node: int) -> QModelIndex:
+        return self.createIndex(self._pos[node], 0, self._refs[node])
+
+    def _showing_placeholder(self) -> bool:
+        return self._placeholder_text is not None and not self._roots
+
+    # --- QAbstractItemModel interface ---
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if column != 0 or row < 0:
+            return QModelIndex()
+        parent_node = self._node(parent)
+        if parent_node is None:
+            if parent.isValid(): # The placeholder has no children
+                return QModelIndex()
+            if self._showing_placeholder():
+                return self.createIndex(row, 0) if row == 0 else QModelIndex()
+            parent_node = _NO_PARENT
+        children = self._child_list(parent_node)
+        if row >= len(children):
+            return QModelIndex()
+        return self.createIndex(row, 0, self._refs[children[row]])
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        node = self._node(index)
+        if node is None:
+            return QModelIndex()
+        parent_node = self._parent[node]
+        if parent_node == _NO_PARENT:
+            return QModelIndex()
+        return self._index_for_node(parent_node)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        parent_node = self._node(parent)
+        if parent_node is None:
+            if parent.isValid(): # Placeholder
+                return 0
+            if self._showing_placeholder():
+                return 1
+            parent_node = _NO_PARENT
+        return len(self._child_list(parent_node))
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def data(self, index: QModelIndex, role: int = _DISPLAY_ROLE):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if node is None: # Placeholder row
+            return self._placeholder_text if role == _DISPLAY_ROLE else None
+        if role == _DISPLAY_ROLE or role == _EDIT_ROLE:
+            return self._titles[node]
+        if role == _TOPIC_ID_ROLE:
+            return self._ids[node]
+        return None
+
+    def setData(self, index: QModelIndex, value, role: int = _EDIT_ROLE) -> bool:
+        node = self._node(index)
+        if node is None or role != _EDIT_ROLE:
+            return False
+        old_title = self._titles[node]
+        new_title = str(value)
+        if new_title == old_title:
+            logger.info(f"Tree item edited but title remained the same for {self._ids[node]}: '{new_title}'")
+            return False
+        self._titles[node] = new_title
+        self.dataChanged.emit(index, index)
+        logger.info(f"Tree item changed: ID {self._ids[node]}, Old: '{old_title}', New: '{new_title}'")
+        self.title_edited.emit(self._ids[node], old_title, new_title)
+        return True
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid() or index.internalPointer() is None:
+            return Qt.ItemFlag.NoItemFlags # Root and the grayed-out placeholder
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = _DISPLAY_ROLE):
+        if section == 0 and orientation == Qt.Orientation.Horizontal and role == _DISPLAY_ROLE:
+            return self._header_label
+        return None
+
+    # --- Topic API used by KnowledgeTreeWidget ---
+
+    def clear(self, placeholder_text: str = None):
+        """Removes all topics, optionally showing a placeholder row instead."""
+        self.beginResetModel()
+        self._reset_storage()
+        self._placeholder_text = placeholder_text
+        self.endResetModel()
+
+    def set_placeholder_text(self, text: str):
+        """Shows (or retitles) the placeholder row. Does nothing while topics are present."""
+        if self._roots:
+            return
+        if self._placeholder_text is None:
+            self.beginInsertRows(QModelIndex(), 0, 0)
+            self._placeholder_text = text
+            self.endInsertRows()
+        else:
+            self._placeholder_text = text
+            placeholder_index = self.index(0, 0)
+            self.dataChanged.emit(placeholder_index, placeholder_index)
+
+    def _drop_placeholder(self):
+        if self._showing_placeholder():
+            self.beginRemoveRows(QModelIndex(), 0, 0)
+            self._placeholder_text = None
+            self.endRemoveRows()
+        else:
+            self._placeholder_text = None
+
+    def reset_topics(self, topics_data: list, placeholder_text: str = None):
+        """
+        Replaces the model contents with the given topic rows (dicts with 'id', 'title'
+        and 'parent_id') in a single reset. Rows are expected in display order within
+        each parent. Children whose parent is not part of the batch are shown as roots.
+        """
+        self.beginResetModel()
+        self._reset_storage()
+        self._placeholder_text = None if topics_data else placeholder_text
+
+        for topic_d in topics_data:
+            self._new_node(topic_d['id'], topic_d['title'], _NO_PARENT)
+
+        orphans = []
+        for node, topic_d in enumerate(topics_data):
+            parent_id = topic_d.get('parent_id')
+            if parent_id is None:
+                self._pos[node] = len(self._roots)
+                self._roots.append(node)
+                continue
+            parent_node = self._id_to_row.get(parent_id)
+            if parent_node is None:
+                orphans.append(node)
+                continue
+            siblings = self._children[parent_node]
+            self._parent[node] = parent_node
+            self._pos[node] = len(siblings)
+            siblings.append(node)
+
+        if orphans:
+            logger.warning(f"Orphaned topics found (parent not loaded): {[self._ids[n] for n in orphans]}. Adding them as roots.")
+            for node in orphans:
+                self._pos[node] = len(self._roots)
+                self._roots.append(node)
+
+        self.endResetModel()
+
+    def insert_topic(self, topic_id: str, title: str, parent_id: str = None) -> QModelIndex:
+        """Appends a topic under parent_id (or at the root if the parent is unknown). Returns its index."""
+        return self.add_topic_items([(topic_id, title, parent_id)])[0]
+
+    def add_topic_items(self, specs: list) -> list:
+        """
+        Appends several topics, given as (topic_id, title, parent_id) tuples, issuing one
+        beginInsertRows/endInsertRows pair per parent instead of one per topic. A parent
+        may itself be part of the batch as long as it comes before its children.
+        Topics whose parent is unknown are added at the root. Topics already in the model
+        (e.g. a queued topic_created arriving after a refresh loaded the topic) are left as
+        they are. Returns the indexes of all given topics.
+        """
+        groups = {} # parent_id -> [(topic_id, title)], in first-seen order
+        seen = set()
+        for topic_id, title, parent_id in specs:
+            if topic_id in self._id_to_row or topic_id in seen:
+                logger.debug(f"Topic {topic_id} is already in the tree model; not adding it again.")
+                continue
+            seen.add(topic_id)
+            groups.setdefault(parent_id, []).append((topic_id, title))
+        if not groups:
+            return [self.index_for_id(topic_id) for topic_id, _, _ in specs]
+        self._drop_placeholder()
+
+        for parent_id, group in groups.items():
+            parent_node = self._parent_node_for(parent_id)
+            parent_index = QModelIndex() if parent_node == _NO_PARENT else self._index_for_node(parent_node)
+            first_row = len(self._child_list(parent_node))
+            self.beginInsertRows(parent_index, first_row, first_row + len(group) - 1)
+            self._append_nodes(parent_node, group)
+            self.endInsertRows()
+
+        return [self.index_for_id(topic_id) for topic_id, _, _ in specs]
+
+    def _parent_node_for(self, parent_id: str) -> int:
+        return self._id_to_row.get(parent_id, _NO_PARENT) if parent_id else _NO_PARENT
+
+    def _append_nodes(self, parent_node: int, group: list):
+        siblings = self._child_list(parent_node)
+        for topic_id, title in group:
+            node = self._new_node(topic_id, title, parent_node)
+            self._pos[node] = len(siblings)
+            siblings.append(node)
+
+    def _detach(self, node: int):
+        """Unlinks node from its parent's child list and renumbers the siblings after it."""
+        siblings = self._child_list(self._parent[node])
+        row = self._pos[node]
+        del siblings[row]
+        for sibling_row in range(row, len(siblings)):
+            self._pos[siblings[sibling_row]] = sibling_row
+
+    def _forget_subtree(self, node: int) -> list:
+        """Drops node and its descendants from the id lookup. Returns their topic ids."""
+        removed_ids = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            topic_id = self._ids[current]
+            if self._id_to_row.get(topic_id) == current:
+                del self._id_to_row[topic_id]
+            removed_ids.append(topic_id)
+            stack.extend(self._children[current])
+        return removed_ids
+
+    def remove_topic(self, topic_id: str) -> list:
+        """
+        Removes a topic together with everything below it. Returns the removed topic ids
+        (empty if the topic is unknown).
+        """
+        node = self._id_to_row.get(topic_id)
+        if node is None:
+            return []
+        parent_node = self._parent[node]
+        parent_index = QModelIndex() if parent_node == _NO_PARENT else self._index_for_node(parent_node)
+        row = self._pos[node]
+        self.beginRemoveRows(parent_index, row, row)
+        self._detach(node)
+        removed_ids = self._forget_subtree(node)
+        self.endRemoveRows()
+        return removed_ids
+
+    def move_topic(self, topic_id: str, new_parent_id: str, new_row: int) -> bool:
+        """
+        Moves a topic (with its subtree) under new_parent_id (None for the root) at new_row,
+        clamped to the sibling count. Announced as a single row move, so the view keeps
+        expansion and selection.
+        Returns False if the topic is unknown or the move would put it under itself.
+        """
+        node = self._id_to_row.get(topic_id)
+        if node is None:
+            return False
+        new_parent_node = self._parent_node_for(new_parent_id)
+        ancestor = new_parent_node
+        while ancestor != _NO_PARENT:
+            if ancestor == node:
+                logger.warning(f"Refusing to move topic {topic_id} under its own descendant {new_parent_id}.")
+                return False
+            ancestor = self._parent[ancestor]
+
+        def relink(row):
+            self._detach(node)
+            siblings = self._child_list(new_parent_node)
+            siblings.insert(row, node)
+            self._parent[node] = new_parent_node
+            for sibling_row in range(row, len(siblings)):
+                self._pos[siblings[sibling_row]] = sibling_row
+
+        old_parent_node = self._parent[node]
+        if old_parent_node == new_parent_node:
+            return self.reorder_topic(topic_id, new_row)
+
+        # Different parents, so detaching the topic doesn't shift the destination rows.
+        row = max(0, min(new_row, len(self._child_list(new_parent_node))))
+        old_parent_index = QModelIndex() if old_parent_node == _NO_PARENT else self._index_for_node(old_parent_node)
+        new_parent_index = QModelIndex() if new_parent_node == _NO_PARENT else self._index_for_node(new_parent_node)
+        old_row = self._pos[node]
+        if not self.beginMoveRows(old_parent_index, old_row, old_row, new_parent_index, row):
+            return False
+        relink(row)
+        self.endMoveRows()
+        return True
+
+    def reorder_topic(self, topic_id: str, new_row: int) -> bool:
+        """
+        Moves a topic to new_row among its current siblings (clamped), announced as a
+        single row move rather than a layout change. Returns False if the topic is unknown.
+        """
+        node = self._id_to_row.get(topic_id)
+        if node is None:
+            return False
+        parent_node = self._parent[node]
+        siblings = self._child_list(parent_node)
+        old_row = self._pos[node]
+        row = max(0, min(new_row, len(siblings) - 1))
+        if row == old_row:
+            return True
+        parent_index = QModelIndex() if parent_node == _NO_PARENT else self._index_for_node(parent_node)
+        # The destination is given in pre-move row numbers, i.e. one past the target when moving down.
+        destination_row = row + 1 if row > old_row else row
+        if not self.beginMoveRows(parent_index, old_row, old_row, parent_index, destination_row):
+            return False
+        del siblings[old_row]
+        siblings.insert(row, node)
+        for sibling_row in range(min(old_row, row), max(old_row, row) + 1):
+            self._pos[siblings[sibling_row]] = sibling_row
+        self.endMoveRows()
+        return True
+
+    def _relayout(self, mutate):
+        """
+        Runs mutate() (which rearranges existing nodes) inside a layout change, remapping
+        persistent indexes by node so the view keeps its expansion and selection.
+        """
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_nodes = [self._node(index) for index in old_indexes]
+        mutate()
+        new_indexes = [index if old_node is None else self._index_for_node(old_node)
+                       for index, old_node in zip(old_indexes, old_nodes)]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    def sync_topics(self, topics_data: list):
+        """
+        Brings the model in line with topics_data (same rows as reset_topics()) by patching
+        only what differs: removed topics are removed, new ones inserted, changed titles
+        updated, and moved/reordered topics relinked in one layout change. Unlike a reset,
+        this keeps the view's expansion, selection and scroll position.
+        Returns (removed_ids, inserted_ids).
+        """
+        new_ids = {topic_d['id'] for topic_d in topics_data}
+
+        removed_ids = []
+        for topic_id in [topic_id for topic_id in self._id_to_row if topic_id not in new_ids]:
+            if topic_id in self._id_to_row: # Not already gone with a removed ancestor
+                removed_ids.extend(self.remove_topic(topic_id))
+
+        for topic_d in topics_data:
+            node = self._id_to_row.get(topic_d['id'])
+            if node is not None and self._titles[node] != topic_d['title']:
+                self.set_title(topic_d['id'], topic_d['title'])
+
+        # New topics are first appended under their parent (parents before children);
+        # the relink below then moves them to their display position.
+        parent_of = {topic_d['id']: topic_d.get('parent_id') for topic_d in topics_data}
+        def depth(topic_id):
+            level = 0
+            parent_id = parent_of.get(topic_id)
+            while parent_id in parent_of and level <= len(parent_of): # Bounded in case of cycles
+                level += 1
+                parent_id = parent_of[parent_id]
+            return level
+        new_topics = [topic_d for topic_d in topics_data if topic_d['id'] not in self._id_to_row]
+        new_topics.sort(key=lambda topic_d: depth(topic_d['id']))
+        inserted_ids = [topic_d['id'] for topic_d in new_topics]
+        self.add_topic_items([(topic_d['id'], topic_d['title'], topic_d.get('parent_id')) for topic_d in new_topics])
+
+        # Desired child lists, built the same way reset_topics() builds them.
+        desired = {_NO_PARENT: []}
+        orphans = []
+        for topic_d in topics_data:
+            node = self._id_to_row[topic_d['id']]
+            parent_id = topic_d.get('parent_id')
+            if parent_id is None:
+                desired[_NO_PARENT].append(node)
+                continue
+            parent_node = self._id_to_row.get(parent_id)
+            if parent_node is None:
+                orphans.append(node)
+                continue
+            desired.setdefault(parent_node, []).append(node)
+        desired[_NO_PARENT].extend(orphans)
+
+        live_nodes = list(self._id_to_row.values())
+        if any(self._child_list(parent_node) != desired.get(parent_node, [])
+               for parent_node in [_NO_PARENT] + live_nodes):
+            def relink():
+                self._roots = []
+                for node in live_nodes:
+                    self._children[node] = []
+                for parent_node, nodes in desired.items():
+                    siblings = self._child_list(parent_node)
+                    siblings.extend(nodes)
+                    for row, node in enumerate(nodes):
+                        self._parent[node] = parent_node
+                        self._pos[node] = row
+            self._relayout(relink)
+
+        return removed_ids, inserted_ids
+
+    def set_title(self, topic_id: str, title: str) -> bool:
+        """Updates a topic title without emitting title_edited. Returns False if the topic is unknown."""
+        node = self._id_to_row.get(topic_id)
+        if node is None:
+            return False
+        self._titles[node] = title
+        index = self._index_for_node(node)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def has_topic(self, topic_id: str) -> bool:
+        return topic_id in self._id_to_row
+
+    def topic_count(self) -> int:
+        return len(self._id_to_row)
+
+    def index_for_id(self, topic_id: str) -> QModelIndex:
+        """Returns the index of the given topic, or an invalid index if it is not in the model."""
+        node = self._id_to_row.get(topic_id)
+        if node is None:
+            return QModelIndex()
+        return self._index_for_node(node)
+
+    def title_for_id(self, topic_id: str):
+        """Returns the title of the given topic, or None if it is not in the model."""
+        node = self._id_to_row.get(topic_id)
+        return None if node is None else self._titles[node]
+
+    def topic_id(self, index: QModelIndex):
+        """Returns the topic_id behind an index, or None for invalid indexes and the placeholder."""
+        node = self._node(index)
+        return None if node is None else self._ids[node]
+
+    def title(self, index: QModelIndex):
+        """Returns the title behind an index, or None for invalid indexes and the placeholder."""
+        node = self._node(index)
+        return None if node is None else self._titles[node]
@@ -9,8 +9,10 @@ logger = logging.getLogger(__name__)
 
 class UndoManager(QObject):
     """
-    Manages undo and redo stacks for commands.
-    Emits signals when the state of the stacks or the ability to undo/redo changes.
+    Manages undo and redo for commands.
+    Commands live in a single history list; everything before _index can be undone and
+    everything from _index on can be redone.
+    Emits signals when the state of the history or the ability to undo/redo changes.
     """
     can_undo_changed = pyqtSignal(bool)
     can_redo_changed = pyqtSignal(bool)
@@ -20,33 +22,51 @@ class UndoManager(QObject):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._undo_stack: List[BaseCommand] = []
-        self._redo_stack: List[BaseCommand] = []
+        self._history: List[BaseCommand] = []
+        self._index = 0 # Number of commands currently applied; history[_index:] is redoable
+        # Last values sent on each signal, so unchanged states aren't re-emitted
+        self._last_can_undo: Optional[bool] = None
+        self._last_can_redo: Optional[bool] = None
+        self._last_undo_text: Optional[str] = None
+        self._last_redo_text: Optional[str] = None
         self._update_signals()
 
-    def _update_signals(self):
-        """Updates all relevant signals based on current stack states."""
+    def _update_signals(self, force: bool = False):
+        """
+        Emits the undo/redo signals whose value changed since they were last emitted.
+        Pass force=True to emit all of them, e.g. for receivers connected later.
+        """
         can_undo = self.can_undo()
         can_redo = self.can_redo()
 
-        self.can_undo_changed.emit(can_undo)
-        self.can_redo_changed.emit(can_redo)
-
-        undo_desc = self._undo_stack[-1].description if can_undo else ""
-        redo_desc = self._redo_stack[-1].description if can_redo else ""
-        
-        self.undo_text_changed.emit(f"Undo {undo_desc}" if undo_desc else "Undo")
-        self.redo_text_changed.emit(f"Redo {redo_desc}" if redo_desc else "Redo")
+        undo_desc = self._history[self._index - 1].description if can_undo else ""
+        redo_desc = self._history[self._index].description if can_redo else ""
+        undo_text = f"Undo {undo_desc}" if undo_desc else "Undo"
+        redo_text = f"Redo {redo_desc}" if redo_desc else "Redo"
+
+        if force or can_undo != self._last_can_undo:
+            self._last_can_undo = can_undo
+            self.can_undo_changed.emit(can_undo)
+        if force or can_redo != self._last_can_redo:
+            self._last_can_redo = can_redo
+            self.can_redo_changed.emit(can_redo)
+        if force or undo_text != self._last_undo_text:
+            self._last_undo_text = undo_text
+            self.undo_text_changed.emit(undo_text)
+        if force or redo_text != self._last_redo_text:
+            self._last_redo_text = redo_text
+            self.redo_text_changed.emit(redo_text)
 
     def execute_command(self, command: BaseCommand):
         """
-        Executes a command, adds it to the undo stack, and clears the redo stack.
+        Executes a command, appends it to the history and drops any redoable commands.
         """
         try:
             command.execute()
-            self._undo_stack.append(command)
-            if self._redo_stack: # Clear redo stack only if it's not empty
-                self._redo_stack.clear()
+            if self._index < len(self._history): # Drop the redo tail only if there is one
+                del self._history[self._index:]
+            self._history.append(command)
+            self._index += 1
             
             logger.info(f"Command executed: {command.description}")
             self.command_executed.emit(command) # Emit signal after successful execution
@@ -61,21 +81,20 @@ class UndoManager(QObject):
 
     def undo(self):
         """
-        Undoes the last command from the undo stack and moves it to the redo stack.
+        Undoes the last applied command; it becomes the next command to redo.
         """
         if not self.can_undo():
             logger.warning("Undo called but nothing to undo.")
             return
 
-        command = self._undo_stack.pop()
+        command = self._history[self._index - 1]
         try:
             command.undo()
-            self._redo_stack.append(command)
+            self._index -= 1
             logger.info(f"Command undone: {command.description}")
         except Exception as e:
             logger.error(f"Error undoing command '{command.description}': {e}", exc_info=True)
-            # If undo fails, put command back on undo stack to maintain consistent state
-            self._undo_stack.append(command) 
+            # If undo fails, the index is left alone so the command stays undoable
             # Optionally, re-raise or handle more gracefully
             raise
         finally:
@@ -83,45 +102,44 @@ class UndoManager(QObject):
 
     def redo(self):
         """
-        Redoes the last command from the redo stack and moves it to the undo stack.
+        Redoes the next undone command; it becomes the next command to undo.
         """
         if not self.can_redo():
             logger.warning("Redo called but nothing to redo.")
             return
 
-        command = self._redo_stack.pop()
+        command = self._history[self._index]
         try:
             command.redo() # or command.execute() if redo is not overridden
-            self._undo_stack.append(command)
+            self._index += 1
             logger.info(f"Command redone: {command.description}")
         except Exception as e:
             logger.error(f"Error redoing command '{command.description}': {e}", exc_info=True)
-            # If redo fails, put command back on redo stack
-            self._redo_stack.append(command)
+            # If redo fails, the index is left alone so the command stays redoable
             # Optionally, re-raise or handle more gracefully
             raise
         finally:
             self._update_signals()
 
     def can_undo(self) -> bool:
-        """Returns True if there are commands in the undo stack."""
-        return bool(self._undo_stack)
+        """Returns True if there are commands that can be undone."""
+        return self._index > 0
 
     def can_redo(self) -> bool:
-        """Returns True if there are commands in the redo stack."""
-        return bool(self._redo_stack)
+        """Returns True if there are commands that can be redone."""
+        return self._index < len(self._history)
 
     def clear_stacks(self):
-        """Clears both undo and redo stacks."""
-        self._undo_stack.clear()
-        self._redo_stack.clear()
+        """Clears the whole undo/redo history."""
+        self._history.clear()
+        self._index = 0
         logger.info("Undo/Redo stacks cleared.")
         self._update_signals()
 
     def get_undo_stack_descriptions(self) -> List[str]:
-        """Returns a list of descriptions for commands in the undo stack."""
-        return [cmd.description for cmd in reversed(self._undo_stack)]
+        """Returns descriptions of the undoable commands, most recent first."""
+        return [cmd.description for cmd in reversed(self._history[:self._index])]
 
     def get_redo_stack_descriptions(self) -> List[str]:
-        """Returns a list of descriptions for commands in the redo stack."""
-        return [cmd.description for cmd in reversed(self._redo_stack)]
\ No newline at end of file
+        """Returns descriptions of the redoable commands, the next one to redo first."""
+        return [cmd.description for cmd in self._history[self._index:]]
\ No newline at end of file
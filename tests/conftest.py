@@ -0,0 +1,24 @@
+import sys
+import os
+
+# Calculate the project root directory (one level up from the 'tests' directory)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add project root to sys.path if it's not already there
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+
+
+@pytest.fixture
+def dm(tmp_path):
+    """A DataManager for a new, migrated collection in a temporary directory."""
+    # Imported here so test modules that don't use Qt load without PyQt6
+    from src.data_manager import DataManager, MIGRATIONS_DIR
+
+    manager = DataManager(str(tmp_path / "collection"))
+    # MIGRATIONS_DIR is relative to the application root, not to the test's working directory
+    manager.migrations_dir = os.path.join(project_root, MIGRATIONS_DIR)
+    manager.initialize_collection_storage()
+    return manager
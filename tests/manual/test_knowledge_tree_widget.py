@@ -0,0 +1,259 @@
+"""
+Manual, interactive harness for KnowledgeTreeWidget.
+
+Run from the project root with:
+
+    python tests/manual/test_knowledge_tree_widget.py
+
+This used to live in the widget module's ``__main__`` block. Nothing here is
+collected by pytest; everything runs only when the file is executed directly.
+"""
+import logging
+import os
+import platform
+import shutil # For cleaning up test directory
+import subprocess
+import sys
+
+# Add project root to sys.path for src imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QPushButton
+
+from src.data_manager import DataManager
+from src.knowledge_tree_widget import KnowledgeTreeWidget
+
+logger = logging.getLogger(__name__)
+
+
+def _fast_rmtree(path):
+    """
+    Removes a directory tree with the platform's native tool, which is much faster than
+    shutil.rmtree on large trees. Falls back to shutil.rmtree if the tool is unavailable.
+    A path that doesn't exist is not an error.
+    """
+    if platform.system() == "Windows":
+        command = ["cmd", "/c", "rd", "/s", "/q", path]
+    else:
+        command = ["rm", "-rf", path]
+    try:
+        subprocess.check_call(command)
+    except (FileNotFoundError, subprocess.CalledProcessError) as e:
+        logger.warning("Native remove failed for %s (%s); falling back to shutil.rmtree", path, e)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# Dummy DataManager for standalone testing
+# Needs to be instantiated with a path
+class DummyDataManagerForTreeTest(DataManager):
+    def __init__(self, collection_base_path):
+        # Create the dummy collection path for the test
+        self.test_collection_dir = collection_base_path
+        if not os.path.exists(self.test_collection_dir):
+            os.makedirs(self.test_collection_dir)
+
+        # Create dummy migrations dir and file for DataManager init
+        # This setup is more involved now that DataManager handles its own migrations dir
+        self.app_migrations_dir = "temp_test_migrations_for_tree"
+        if not os.path.exists(self.app_migrations_dir):
+            os.makedirs(self.app_migrations_dir)
+
+        dummy_mig_file = os.path.join(self.app_migrations_dir, "000_dummy.sql")
+        if not os.path.exists(dummy_mig_file):
+             with open(dummy_mig_file, "w") as f: f.write("-- test")
+
+        # Call parent DataManager's init, but override migrations_dir for the test
+        super().__init__(collection_base_path)
+        self.migrations_dir = self.app_migrations_dir # Point to our temp app migrations
+
+        # Initialize the dummy collection (creates DB, text_files dir)
+        try:
+            self.initialize_collection_storage()
+        except Exception as e:
+            logger.error("Error initializing DummyDataManagerForTreeTest storage: %s", e)
+            # Depending on test needs, might raise e or log and continue
+
+        self.topics = [
+            {'id': 'root1', 'title': 'Root Topic 1', 'parent_id': None, 'created_at': '2023-01-01T10:00:00'},
+            {'id': 'child1_1', 'title': 'Child 1.1 (R1)', 'parent_id': 'root1', 'created_at': '2023-01-01T10:01:00'},
+            {'id': 'child1_2', 'title': 'Child 1.2 (R1)', 'parent_id': 'root1', 'created_at': '2023-01-01T10:02:00'},
+            {'id': 'grandchild1_1_1', 'title': 'Grandchild 1.1.1 (C1.1)', 'parent_id': 'child1_1', 'created_at': '2023-01-01T10:03:00'},
+            {'id': 'root2', 'title': 'Root Topic 2 (Empty)', 'parent_id': None, 'created_at': '2023-01-01T10:04:00'},
+        ]
+        # Simulate writing these to the dummy DB (simplified for test)
+        conn = self._get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DROP TABLE IF EXISTS topics") # Ensure clean table
+            # Recreate table based on a minimal schema (adapt from your actual migrations)
+            cursor.execute("""
+            CREATE TABLE topics (
+                id TEXT PRIMARY KEY, 
+                parent_id TEXT, 
+                title TEXT, 
+                text_file_uuid TEXT, 
+                created_at timestamp, 
+                updated_at timestamp,
+                display_order INTEGER
+            )""")
+            for t in self.topics:
+                cursor.execute("INSERT INTO topics (id, title, parent_id, text_file_uuid, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                               (t['id'], t['title'], t.get('parent_id'), str(os.urandom(16).hex()), t['created_at'], t['created_at']))
+            conn.commit()
+        except Exception as e:
+            logger.error("Error setting up dummy DB for tree test: %s", e)
+        finally:
+            conn.close()
+
+
+    def get_topic_hierarchy(self):
+        # In a real scenario, this would query self.db_path
+        # For this dummy, we return the predefined list
+        logger.info("[DummyDM] get_topic_hierarchy called for %s", self.collection_base_path)
+        return self.topics
+
+    def update_topic_title(self, topic_id, new_title):
+        logger.info("[DummyDM] Update title for %s to '%s' in %s", topic_id, new_title, self.collection_base_path)
+        # Simulate update in self.topics for consistency if needed for further tests
+        for topic in self.topics:
+            if topic['id'] == topic_id:
+                topic['title'] = new_title
+                break
+        return True
+
+    def cleanup_test_dirs(self):
+        # Both removal paths tolerate missing directories, so no existence checks first.
+        _fast_rmtree(self.test_collection_dir)
+        logger.info("Cleaned up test collection dir: %s", self.test_collection_dir)
+        _fast_rmtree(self.app_migrations_dir)
+        logger.info("Cleaned up test migrations dir: %s", self.app_migrations_dir)
+
+
+# Dummy UndoManager for the test
+class DummyUndoManager:
+    def __init__(self):
+        self.stack = []
+        logger.info("DummyUndoManager initialized for test.")
+    def push_command(self, command):
+        logger.info("DummyUndoManager: Pushing command: %s", command.description)
+        try:
+            command.execute() # Simulate execution
+            self.stack.append(command)
+            logger.info("DummyUndoManager: Executed and added to stack: %s", command.description)
+        except Exception as e:
+            logger.error("DummyUndoManager: Error executing command %s: %s", command.description, e)
+
+    def undo(self):
+        if self.stack:
+            command = self.stack.pop()
+            logger.info("DummyUndoManager: Undoing command: %s", command.description)
+            try:
+                command.undo()
+            except Exception as e:
+                logger.error("DummyUndoManager: Error undoing command %s: %s", command.description, e)
+        else:
+            logger.info("DummyUndoManager: Undo stack empty.")
+
+
+def main():
+    app = QApplication(sys.argv)
+    main_win = QMainWindow()
+    main_win.setWindowTitle("Knowledge Tree Widget Test")
+
+    central_widget = QWidget()
+    main_win.setCentralWidget(central_widget)
+    layout = QVBoxLayout(central_widget)
+
+    # Create a dummy DataManager instance for the test
+    test_collection_path = os.path.abspath("temp_tree_widget_test_collection")
+    dummy_dm_instance = None
+
+    main_win.undo_manager = DummyUndoManager() # Attach to main_win for keyPressEvent to find
+
+    try:
+        dummy_dm_instance = DummyDataManagerForTreeTest(test_collection_path)
+
+        tree_widget = KnowledgeTreeWidget(parent=main_win) # Pass parent for self.window()
+        tree_widget.load_tree_data(dummy_dm_instance) # Load data using the DM instance
+        layout.addWidget(tree_widget)
+
+        def test_add_topic():
+            root_count = tree_widget.model.rowCount()
+            tree_widget.add_topic_item(f"New Root Topic {root_count}", f"new_root_{root_count}", parent_id=None)
+
+        def test_add_child_topic():
+            selected_id = tree_widget.get_selected_topic_id()
+            if selected_id:
+                parent_index = tree_widget._index_for_id(selected_id)
+                if parent_index.isValid():
+                    child_count = tree_widget.model.rowCount(parent_index)
+                    tree_widget.add_topic_item(f"New Child {child_count}", f"new_child_{child_count}_of_{selected_id}", parent_id=selected_id)
+            else:
+                logger.warning("No parent selected to add child to.")
+
+        def test_update_selected_title():
+            selected_id = tree_widget.get_selected_topic_id()
+            if selected_id:
+                tree_widget.update_topic_item_title(selected_id, "TITLE UPDATED EXTERNALLY")
+            else:
+                logger.warning("No item selected to update title.")
+
+        def test_clear_and_reload():
+            tree_widget.clear_tree()
+            logger.info("Tree cleared. Reloading with placeholder.")
+            tree_widget.load_tree_data(dummy_dm_instance)
+
+        def test_select_all_and_press_delete():
+            logger.info("Simulating select all and pressing Delete...")
+            # Select the first few root items as one batched selection for testing.
+            if tree_widget.model.rowCount() > 0:
+                root_ids = [tree_widget.model.topic_id(tree_widget.model.index(row, 0))
+                            for row in range(min(2, tree_widget.model.rowCount()))]
+                tree_widget.select_topic_items([topic_id for topic_id in root_ids if topic_id])
+
+                # Same path the Delete key takes, without building a key event
+                tree_widget._delete_selected()
+                logger.info("Delete of selected topics requested.")
+            else:
+                logger.info("No items to select for delete test.")
+
+
+        btn_add_root = QPushButton("Add Root Topic")
+        btn_add_root.clicked.connect(test_add_topic)
+        layout.addWidget(btn_add_root)
+
+        btn_add_child = QPushButton("Add Child to Selected")
+        btn_add_child.clicked.connect(test_add_child_topic)
+        layout.addWidget(btn_add_child)
+
+        btn_update_title = QPushButton("Update Selected Title Externally")
+        btn_update_title.clicked.connect(test_update_selected_title)
+        layout.addWidget(btn_update_title)
+
+        btn_clear_reload = QPushButton("Clear and Reload Tree")
+        btn_clear_reload.clicked.connect(test_clear_and_reload)
+        layout.addWidget(btn_clear_reload)
+
+        btn_test_delete = QPushButton("Test Delete Selected (Simulated)")
+        btn_test_delete.clicked.connect(test_select_all_and_press_delete)
+        layout.addWidget(btn_test_delete)
+
+
+        main_win.setGeometry(200, 200, 400, 600) # Increased height for new button
+        main_win.show()
+
+        exit_code = app.exec()
+
+    except Exception as e:
+        logger.error("Error in KnowledgeTreeWidget test setup: %s", e)
+        exit_code = 1
+    finally:
+        if dummy_dm_instance:
+            dummy_dm_instance.cleanup_test_dirs() # Clean up test directories
+        sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
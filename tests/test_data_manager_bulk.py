@@ -0,0 +1,87 @@
+"""
+Tests for DataManager.bulk(): change signals raised inside a bulk block are held back and
+replaced by a single data_changed_bulk when the outermost block exits.
+"""
+import sys
+import os
+
+# Calculate the project root directory (one level up from the 'tests' directory)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add project root to sys.path if it's not already there
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+
+
+@pytest.fixture
+def emitted(dm):
+    """Records the change signals of dm as (signal name, args) in emission order."""
+    events = []
+    for name in ('topic_created', 'topic_title_changed', 'topic_deleted', 'topic_moved', 'data_changed_bulk'):
+        getattr(dm, name).connect(lambda *args, name=name: events.append((name, args)))
+    return events
+
+
+def test_changes_outside_bulk_are_emitted_directly(dm, emitted):
+    topic_id = dm.create_topic(custom_title="Direct")
+    dm.update_topic_title(topic_id, "Renamed")
+
+    assert [name for name, _ in emitted] == ['topic_created', 'topic_title_changed']
+    assert emitted[1][1] == (topic_id, "Renamed")
+
+
+def test_bulk_emits_one_data_changed_bulk(dm, emitted):
+    with dm.bulk():
+        parent_id = dm.create_topic(custom_title="Parent")
+        child_id = dm.create_topic(custom_title="Child", parent_id=parent_id)
+        dm.update_topic_title(child_id, "Renamed child")
+        dm.delete_topic(parent_id)
+        assert emitted == []
+
+    assert emitted == [('data_changed_bulk', ())]
+
+
+def test_nested_bulk_emits_once_when_outermost_exits(dm, emitted):
+    with dm.bulk():
+        with dm.bulk():
+            dm.create_topic(custom_title="Inner")
+        assert emitted == []
+        dm.create_topic(custom_title="Outer")
+
+    assert emitted == [('data_changed_bulk', ())]
+    assert dm._bulk_depth == 0
+
+    dm.create_topic(custom_title="After")
+    assert [name for name, _ in emitted] == ['data_changed_bulk', 'topic_created']
+
+
+def test_bulk_without_changes_emits_nothing(dm, emitted):
+    with dm.bulk() as manager:
+        assert manager is dm
+        dm.get_topic_hierarchy()
+
+    assert emitted == []
+
+
+def test_bulk_emits_and_resets_when_body_raises(dm, emitted):
+    with pytest.raises(RuntimeError):
+        with dm.bulk():
+            dm.create_topic(custom_title="Before the failure")
+            raise RuntimeError("boom")
+
+    # The change that did happen is still announced, and later changes aren't held back
+    assert emitted == [('data_changed_bulk', ())]
+    assert dm._bulk_depth == 0
+    dm.create_topic(custom_title="After")
+    assert [name for name, _ in emitted] == ['data_changed_bulk', 'topic_created']
+
+
+def test_bulk_raising_without_changes_emits_nothing(dm, emitted):
+    with pytest.raises(RuntimeError):
+        with dm.bulk():
+            raise RuntimeError("boom")
+
+    assert emitted == []
+    assert dm._bulk_depth == 0
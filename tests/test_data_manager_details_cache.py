@@ -0,0 +1,106 @@
+"""
+Tests for the get_topic_details() cache in DataManager: every change to a topic's row must
+drop its cached copy, so later lookups never return stale details.
+"""
+import sys
+import os
+
+# Calculate the project root directory (one level up from the 'tests' directory)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add project root to sys.path if it's not already there
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+
+
+@pytest.fixture
+def topic_id(dm):
+    topic_id = dm.create_topic("<p>Body</p>", custom_title="Original")
+    assert dm.get_topic_details(topic_id)['title'] == "Original" # Now cached
+    return topic_id
+
+
+def test_details_are_cached_and_copied(dm, topic_id):
+    details = dm.get_topic_details(topic_id)
+    details['title'] = "Changed by the caller"
+
+    assert topic_id in dm._details_cache
+    assert dm.get_topic_details(topic_id)['title'] == "Original"
+
+
+def test_unknown_topic_is_not_cached(dm):
+    assert dm.get_topic_details("missing") is None
+    assert "missing" not in dm._details_cache
+
+
+def test_title_change_invalidates(dm, topic_id):
+    dm.update_topic_title(topic_id, "Renamed")
+    assert dm.get_topic_details(topic_id)['title'] == "Renamed"
+
+
+def test_content_save_invalidates(dm, topic_id):
+    before = dm.get_topic_details(topic_id)['updated_at']
+    assert dm.save_topic_content(topic_id, "<p>New body</p>")
+
+    assert dm.get_topic_details(topic_id)['updated_at'] != before
+    assert dm.get_topic_content(topic_id) == "<p>New body</p>"
+
+
+def test_move_invalidates_topic_and_siblings(dm, topic_id):
+    parent_id = dm.create_topic(custom_title="Parent")
+    sibling_id = dm.create_topic(custom_title="Sibling")
+    dm.get_topic_details(sibling_id)
+
+    dm.move_topic(topic_id, parent_id, 0)
+
+    assert dm.get_topic_details(topic_id)['parent_id'] == parent_id
+    assert sibling_id not in dm._details_cache # Its display_order may have shifted
+
+
+def test_delete_invalidates_subtree(dm, topic_id):
+    child_id = dm.create_topic(custom_title="Child", parent_id=topic_id)
+    dm.get_topic_details(child_id)
+
+    assert dm.delete_topic(topic_id)
+
+    assert dm.get_topic_details(topic_id) is None
+    assert dm.get_topic_details(child_id) is None
+
+
+def test_undo_restore_with_existing_id_is_seen(dm, topic_id):
+    old_details = dm.get_topic_details(topic_id)
+    dm.delete_topic(topic_id)
+
+    # What DeleteMultipleTopicsCommand.undo does: recreate the row under the same id
+    restored_id = dm.create_topic(
+        "<p>Restored</p>", parent_id=None, custom_title="Restored",
+        topic_id=topic_id, text_file_uuid="restored-file",
+        created_at=old_details['created_at'], updated_at=old_details['updated_at'],
+        display_order=old_details['display_order'])
+
+    assert restored_id == topic_id
+    details = dm.get_topic_details(topic_id)
+    assert details['title'] == "Restored"
+    assert details['text_file_uuid'] == "restored-file"
+
+
+def test_extraction_invalidates_parent(dm, topic_id):
+    child_id = dm.create_topic(custom_title="Extract", parent_id=topic_id)
+    dm.create_extraction(topic_id, child_id, 0, 4)
+    assert topic_id not in dm._details_cache
+
+
+def test_lookup_racing_an_invalidation_is_not_cached(dm, topic_id, monkeypatch):
+    dm._forget_details()
+    real_connection = dm._get_db_connection
+
+    def connection_with_concurrent_change():
+        # Stands in for a save committing on a worker thread while the row is being read
+        dm._forget_details([topic_id])
+        return real_connection()
+
+    monkeypatch.setattr(dm, '_get_db_connection', connection_with_concurrent_change)
+    assert dm.get_topic_details(topic_id)['title'] == "Original"
+    assert topic_id not in dm._details_cache
@@ -0,0 +1,158 @@
+import sys
+import os
+
+# Calculate the project root directory (one level up from the 'tests' directory)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add project root to sys.path if it's not already there
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import logging
+import queue
+import time
+
+import pytest
+
+from src import logger_config
+from src.logger_config import BatchedRotatingFileHandler
+
+
+def make_record(message, level=logging.INFO):
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return tmp_path / "test.log"
+
+
+def make_handler(log_path, **kwargs):
+    kwargs.setdefault("maxBytes", 0)
+    kwargs.setdefault("backupCount", 0)
+    handler = BatchedRotatingFileHandler(filename=log_path, encoding='utf-8', delay=True, **kwargs)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def read_log_lines(log_path):
+    """Returns the lines of the log file and all of its rotated backups."""
+    lines = []
+    for path in sorted(log_path.parent.glob(log_path.name + "*")):
+        lines.extend(path.read_text(encoding='utf-8').splitlines())
+    return lines
+
+
+def test_rollover_keeps_every_record(log_path):
+    handler = make_handler(log_path, maxBytes=200, backupCount=50)
+    try:
+        for i in range(200):
+            # WARNING is written immediately, so every record is its own write and
+            # several writes cross the size limit.
+            handler.handle(make_record(f"record {i:03d}", logging.WARNING))
+    finally:
+        handler.close()
+
+    lines = read_log_lines(log_path)
+    assert sorted(lines) == [f"record {i:03d}" for i in range(200)]
+    assert len(list(log_path.parent.glob(log_path.name + ".*"))) >= 5 # Actually rolled over
+
+
+def test_records_are_buffered_until_a_batch_is_full(log_path):
+    handler = make_handler(log_path)
+    try:
+        for i in range(logger_config.FLUSH_BATCH_SIZE - 1):
+            handler.handle(make_record(f"record {i}"))
+        assert not log_path.exists() # delay=True: nothing written, not even opened
+
+        handler.handle(make_record("last of the batch"))
+        assert len(read_log_lines(log_path)) == logger_config.FLUSH_BATCH_SIZE
+    finally:
+        handler.close()
+
+
+def test_warning_writes_buffered_records_immediately(log_path):
+    handler = make_handler(log_path)
+    try:
+        handler.handle(make_record("info"))
+        handler.handle(make_record("warning", logging.WARNING))
+        assert read_log_lines(log_path) == ["info", "warning"]
+    finally:
+        handler.close()
+
+
+def test_close_writes_buffered_records(log_path):
+    handler = make_handler(log_path)
+    handler.handle(make_record("pending"))
+    handler.close()
+    assert read_log_lines(log_path) == ["pending"]
+
+
+def test_rollover_measures_encoded_size(log_path):
+    handler = make_handler(log_path, maxBytes=100, backupCount=5)
+    try:
+        handler.handle(make_record("a" * 50, logging.WARNING))
+        # 31 characters, but 61 bytes in UTF-8: together with the first line it exceeds
+        # maxBytes, so it has to start a new file.
+        handler.handle(make_record("é" * 30, logging.WARNING))
+    finally:
+        handler.close()
+
+    assert log_path.read_text(encoding='utf-8').splitlines() == ["é" * 30]
+    assert (log_path.parent / (log_path.name + ".1")).read_text(encoding='utf-8').splitlines() == ["a" * 50]
+
+
+def test_idle_listener_flushes_buffered_records(log_path, monkeypatch):
+    monkeypatch.setattr(logger_config, "FLUSH_INTERVAL_SECONDS", 0.05)
+    handler = make_handler(log_path)
+    log_queue = queue.Queue()
+    listener = logger_config.IdleFlushQueueListener(log_queue, handler)
+    listener.start()
+    try:
+        log_queue.put(make_record("while idle"))
+        deadline = time.monotonic() + 5
+        while not (log_path.exists() and read_log_lines(log_path)) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert read_log_lines(log_path) == ["while idle"]
+    finally:
+        listener.stop()
+        handler.close()
+
+
+def test_failed_write_keeps_records_for_the_next_attempt(log_path, monkeypatch, capsys):
+    handler = make_handler(log_path)
+    real_open = handler._open
+    def failing_open():
+        raise OSError("disk full")
+    monkeypatch.setattr(handler, '_open', failing_open)
+    try:
+        handler.handle(make_record("kept"))
+        handler.handle(make_record("failed write", logging.WARNING))
+        assert not log_path.exists()
+        error_output = capsys.readouterr().err
+        assert "disk full" in error_output
+        assert "2 record(s) kept" in error_output
+
+        monkeypatch.setattr(handler, '_open', real_open)
+        handler.handle(make_record("next write", logging.WARNING))
+        assert read_log_lines(log_path) == ["kept", "failed write", "next write"]
+    finally:
+        handler.close()
+
+
+def test_failed_writes_keep_a_bounded_buffer(log_path, monkeypatch, capsys):
+    monkeypatch.setattr(logger_config, "MAX_BUFFERED_RECORDS", 3)
+    handler = make_handler(log_path)
+    real_open = handler._open
+    def failing_open():
+        raise OSError("disk full")
+    monkeypatch.setattr(handler, '_open', failing_open)
+    try:
+        for i in range(5):
+            handler.handle(make_record(f"record {i}", logging.WARNING))
+
+        assert handler._buffer == ["record 2\n", "record 3\n", "record 4\n"]
+        assert "1 oldest dropped" in capsys.readouterr().err
+    finally:
+        monkeypatch.setattr(handler, '_open', real_open)
+        handler.close()
@@ -97,18 +97,18 @@ def test_basic_topic_selection_updates_editor(qtbot: QtBot, test_app_env):
     qtbot.addWidget(main_window)
     main_window.show()
     
-    # 3. Wait for the tree to populate and find the QTreeWidgetItem for the created topic
-    # KnowledgeTreeWidget._topic_item_map maps topic_id to QTreeWidgetItem
+    # 3. Wait for the tree to populate and find the model index for the created topic
+    # TopicTreeModel.index_for_id maps topic_id to its QModelIndex
     def tree_has_item_check():
-        return main_window.tree_widget._topic_item_map.get(root_topic_id) is not None
+        return main_window.tree_widget.model.index_for_id(root_topic_id).isValid()
     qtbot.waitUntil(tree_has_item_check, timeout=1000) # Wait for tree to populate
 
-    tree_item = main_window.tree_widget._topic_item_map.get(root_topic_id)
-    assert tree_item is not None, f"Topic ID {root_topic_id} not found in tree widget's item map."
+    tree_index = main_window.tree_widget.model.index_for_id(root_topic_id)
+    assert tree_index.isValid(), f"Topic ID {root_topic_id} not found in tree widget's model."
 
     # 4. Simulate selecting the item in the tree
     # This should trigger the topic_selected signal and update the editor
-    main_window.tree_widget.setCurrentIndex(tree_item.index())
+    main_window.tree_widget.setCurrentIndex(tree_index)
     
     # The signal connection should call main_window.handle_topic_selected,
     # which then calls editor_widget.load_topic_content.
@@ -0,0 +1,276 @@
+"""
+Tests for TopicTreeModel. Every test runs with a QAbstractItemModelTester attached to
+the model, which re-checks the model's consistency after each change it announces.
+"""
+import sys
+import os
+
+# Calculate the project root directory (one level up from the 'tests' directory)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add project root to sys.path if it's not already there
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+from PyQt6.QtCore import QModelIndex, QPersistentModelIndex
+from PyQt6.QtTest import QAbstractItemModelTester
+
+from src.topic_tree_model import TopicTreeModel
+
+# QAbstractItemModelTester reports what it finds as Qt warnings; fail the test on those.
+pytestmark = pytest.mark.qt_log_level_fail("WARNING")
+
+TOPICS = [
+    {'id': 'r1', 'title': 'Root 1', 'parent_id': None},
+    {'id': 'r2', 'title': 'Root 2', 'parent_id': None},
+    {'id': 'c1', 'title': 'Child 1', 'parent_id': 'r1'},
+    {'id': 'c2', 'title': 'Child 2', 'parent_id': 'r1'},
+    {'id': 'g1', 'title': 'Grandchild 1', 'parent_id': 'c1'},
+]
+
+
+@pytest.fixture
+def model(qapp):
+    model = TopicTreeModel()
+    # Referenced from this frame until teardown, so it watches the model for the whole test
+    tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Warning)
+    yield model
+    del tester
+
+
+@pytest.fixture
+def loaded_model(model):
+    model.reset_topics(TOPICS)
+    return model
+
+
+def child_ids(model, parent_id=None):
+    """Returns the topic ids shown under parent_id (None for the root), in row order."""
+    parent = QModelIndex() if parent_id is None else model.index_for_id(parent_id)
+    return [model.topic_id(model.index(row, 0, parent)) for row in range(model.rowCount(parent))]
+
+
+def parent_id_of(model, topic_id):
+    return model.topic_id(model.parent(model.index_for_id(topic_id)))
+
+
+def test_reset_builds_hierarchy(loaded_model):
+    assert child_ids(loaded_model) == ['r1', 'r2']
+    assert child_ids(loaded_model, 'r1') == ['c1', 'c2']
+    assert child_ids(loaded_model, 'c1') == ['g1']
+    assert child_ids(loaded_model, 'r2') == []
+    assert parent_id_of(loaded_model, 'g1') == 'c1'
+    assert parent_id_of(loaded_model, 'r1') is None
+    assert loaded_model.topic_count() == 5
+    assert loaded_model.title_for_id('c2') == 'Child 2'
+
+
+def test_reset_adds_topics_with_unknown_parent_as_roots(model):
+    model.reset_topics(TOPICS + [{'id': 'orphan', 'title': 'Orphan', 'parent_id': 'missing'}])
+    assert child_ids(model) == ['r1', 'r2', 'orphan']
+
+
+def test_placeholder_is_shown_only_without_topics(model):
+    model.reset_topics([], placeholder_text="Nothing here")
+    assert model.rowCount() == 1
+    placeholder = model.index(0, 0)
+    assert model.data(placeholder) == "Nothing here"
+    assert model.topic_id(placeholder) is None
+
+    model.set_placeholder_text("Still nothing")
+    assert model.data(model.index(0, 0)) == "Still nothing"
+
+    model.insert_topic('t1', 'Topic 1')
+    assert child_ids(model) == ['t1']
+
+    model.clear("Cleared")
+    assert model.rowCount() == 1
+    assert not model.has_topic('t1')
+
+
+def test_insert_topic_appends_under_parent(loaded_model):
+    index = loaded_model.insert_topic('c3', 'Child 3', 'r1')
+    assert loaded_model.topic_id(index) == 'c3'
+    assert child_ids(loaded_model, 'r1') == ['c1', 'c2', 'c3']
+
+    loaded_model.insert_topic('r3', 'Root 3', 'not-loaded')
+    assert child_ids(loaded_model) == ['r1', 'r2', 'r3']
+
+
+def test_insert_topic_already_in_model_is_not_added_twice(loaded_model):
+    inserts = []
+    loaded_model.rowsInserted.connect(lambda *args: inserts.append(args))
+
+    # E.g. a queued topic_created delivered after a refresh already loaded the topic
+    index = loaded_model.insert_topic('c1', 'Child 1 (late)', 'r2')
+    indexes = loaded_model.add_topic_items([('n1', 'New 1', 'r2'), ('n1', 'New 1 again', 'r2')])
+
+    assert loaded_model.topic_id(index) == 'c1'
+    assert parent_id_of(loaded_model, 'c1') == 'r1'
+    assert loaded_model.title_for_id('c1') == 'Child 1'
+    assert [loaded_model.topic_id(index) for index in indexes] == ['n1', 'n1']
+    assert child_ids(loaded_model, 'r2') == ['n1']
+    assert loaded_model.topic_count() == 6
+    assert len(inserts) == 1
+
+    # Removing it leaves no stray row behind
+    loaded_model.remove_topic('c1')
+    assert child_ids(loaded_model, 'r1') == ['c2']
+
+def test_remove_topic_removes_subtree(loaded_model):
+    assert sorted(loaded_model.remove_topic('c1')) == ['c1', 'g1']
+    assert child_ids(loaded_model, 'r1') == ['c2']
+    assert not loaded_model.has_topic('g1')
+    assert loaded_model.index_for_id('c2').row() == 0
+    assert loaded_model.remove_topic('c1') == []
+
+
+def test_set_data_updates_title_and_reports_the_edit(loaded_model):
+    edits = []
+    loaded_model.title_edited.connect(lambda *args: edits.append(args))
+    index = loaded_model.index_for_id('c1')
+
+    assert loaded_model.setData(index, 'Renamed')
+    assert not loaded_model.setData(index, 'Renamed') # Unchanged
+    assert loaded_model.title_for_id('c1') == 'Renamed'
+    assert edits == [('c1', 'Child 1', 'Renamed')]
+
+    assert loaded_model.set_title('c2', 'Quietly renamed')
+    assert loaded_model.title_for_id('c2') == 'Quietly renamed'
+    assert len(edits) == 1
+
+
+def test_move_topic_relinks_subtree(loaded_model):
+    assert loaded_model.move_topic('c1', 'r2', 0)
+    assert child_ids(loaded_model, 'r1') == ['c2']
+    assert child_ids(loaded_model, 'r2') == ['c1']
+    assert child_ids(loaded_model, 'c1') == ['g1']
+    assert parent_id_of(loaded_model, 'c1') == 'r2'
+
+    assert loaded_model.move_topic('c1', None, 0)
+    assert child_ids(loaded_model) == ['c1', 'r1', 'r2']
+
+
+def test_move_topic_refuses_own_descendant(loaded_model):
+    assert not loaded_model.move_topic('r1', 'g1', 0)
+    assert not loaded_model.move_topic('unknown', None, 0)
+    assert child_ids(loaded_model, 'c1') == ['g1']
+
+
+def test_reorder_topic_among_siblings(loaded_model):
+    assert loaded_model.reorder_topic('r1', 5) # Clamped to the last row
+    assert child_ids(loaded_model) == ['r2', 'r1']
+    assert loaded_model.reorder_topic('r1', 0)
+    assert child_ids(loaded_model) == ['r1', 'r2']
+    assert child_ids(loaded_model, 'c1') == ['g1']
+
+
+def test_add_topic_items_inserts_once_per_parent(loaded_model):
+    inserts = []
+    loaded_model.rowsInserted.connect(
+        lambda parent, first, last: inserts.append((loaded_model.topic_id(parent), first, last)))
+
+    indexes = loaded_model.add_topic_items([
+        ('c3', 'Child 3', 'r1'),
+        ('n1', 'New 1', 'r2'),
+        ('c4', 'Child 4', 'r1'),
+        ('n2', 'New 2', 'n1'), # Parent added earlier in the same batch
+    ])
+
+    assert [loaded_model.topic_id(index) for index in indexes] == ['c3', 'n1', 'c4', 'n2']
+    assert child_ids(loaded_model, 'r1') == ['c1', 'c2', 'c3', 'c4']
+    assert child_ids(loaded_model, 'r2') == ['n1']
+    assert child_ids(loaded_model, 'n1') == ['n2']
+    assert inserts == [('r1', 2, 3), ('r2', 0, 0), ('n1', 0, 0)]
+
+
+def test_add_topic_items_replaces_placeholder(model):
+    model.clear("Empty")
+    assert model.add_topic_items([]) == []
+    assert model.rowCount() == 1
+
+    model.add_topic_items([('a', 'A', None), ('b', 'B', 'unknown')])
+    assert child_ids(model) == ['a', 'b']
+
+
+def test_sync_topics_patches_differences(loaded_model):
+    resets = []
+    loaded_model.modelReset.connect(lambda: resets.append(True))
+    kept = QPersistentModelIndex(loaded_model.index_for_id('g1'))
+
+    removed_ids, inserted_ids = loaded_model.sync_topics([
+        {'id': 'r2', 'title': 'Root 2 renamed', 'parent_id': None},
+        {'id': 'r1', 'title': 'Root 1', 'parent_id': None},
+        {'id': 'g1', 'title': 'Grandchild 1', 'parent_id': 'r2'},
+        {'id': 'n1', 'title': 'New 1', 'parent_id': 'g1'},
+        {'id': 'c1', 'title': 'Child 1', 'parent_id': 'r1'},
+    ])
+
+    assert removed_ids == ['c2']
+    assert inserted_ids == ['n1']
+    assert child_ids(loaded_model) == ['r2', 'r1']
+    assert child_ids(loaded_model, 'r1') == ['c1']
+    assert child_ids(loaded_model, 'r2') == ['g1']
+    assert child_ids(loaded_model, 'g1') == ['n1']
+    assert loaded_model.title_for_id('r2') == 'Root 2 renamed'
+    assert not resets
+    assert kept.isValid() and loaded_model.topic_id(kept) == 'g1'
+
+
+def test_sync_topics_without_changes_is_silent(loaded_model):
+    changes = []
+    loaded_model.layoutChanged.connect(lambda *args: changes.append('layout'))
+    loaded_model.dataChanged.connect(lambda *args: changes.append('data'))
+
+    assert loaded_model.sync_topics(TOPICS) == ([], [])
+    assert changes == []
+
+
+def record_moves(model):
+    """Collects rowsMoved as (source parent id, start, end, destination parent id, row) and counts layout changes."""
+    events = {'moves': [], 'layouts': 0}
+    def on_moved(parent, start, end, destination, row):
+        events['moves'].append((model.topic_id(parent), start, end, model.topic_id(destination), row))
+    def on_layout(*args):
+        events['layouts'] += 1
+    model.rowsMoved.connect(on_moved)
+    model.layoutChanged.connect(on_layout)
+    return events
+
+
+def test_reorder_topic_is_a_single_row_move(loaded_model):
+    loaded_model.insert_topic('c3', 'Child 3', 'r1')
+    events = record_moves(loaded_model)
+
+    assert loaded_model.reorder_topic('c1', 2) # Down: destination is one past the target row
+    assert loaded_model.reorder_topic('c3', 0) # Up
+    assert loaded_model.reorder_topic('c3', 0) # Already there
+
+    assert child_ids(loaded_model, 'r1') == ['c3', 'c2', 'c1']
+    assert events['moves'] == [('r1', 0, 0, 'r1', 3), ('r1', 1, 1, 'r1', 0)]
+    assert events['layouts'] == 0
+    assert not loaded_model.reorder_topic('unknown', 0)
+
+
+def test_move_topic_across_parents_is_a_single_row_move(loaded_model):
+    events = record_moves(loaded_model)
+    kept = QPersistentModelIndex(loaded_model.index_for_id('g1'))
+
+    assert loaded_model.move_topic('c1', 'r2', 7) # Clamped to the end of r2's children
+    assert loaded_model.move_topic('c2', None, 1)
+
+    assert child_ids(loaded_model) == ['r1', 'c2', 'r2']
+    assert child_ids(loaded_model, 'r2') == ['c1']
+    assert events['moves'] == [('r1', 0, 0, 'r2', 0), ('r1', 0, 0, None, 1)]
+    assert events['layouts'] == 0
+    assert loaded_model.topic_id(kept) == 'g1'
+    assert loaded_model.topic_id(kept.parent()) == 'c1'
+
+
+def test_move_topic_under_own_descendant_changes_nothing(loaded_model):
+    events = record_moves(loaded_model)
+    assert not loaded_model.move_topic('c1', 'g1', 0)
+    assert not loaded_model.move_topic('c1', 'c1', 0)
+    assert events == {'moves': [], 'layouts': 0}
+    assert parent_id_of(loaded_model, 'c1') == 'r1'
@@ -0,0 +1,98 @@
+import sys
+import os
+
+# Calculate the project root directory (one level up from the 'tests' directory)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add project root to sys.path if it's not already there
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+
+from src.commands.base_command import BaseCommand
+from src.undo_manager import UndoManager
+
+
+class RecordingCommand(BaseCommand):
+    """Command that appends to a shared log instead of touching any data."""
+
+    def __init__(self, name, log, fail_on_undo=False):
+        self.name = name
+        self.log = log
+        self.fail_on_undo = fail_on_undo
+
+    def execute(self):
+        self.log.append(f"do {self.name}")
+
+    def undo(self):
+        if self.fail_on_undo:
+            raise RuntimeError(f"cannot undo {self.name}")
+        self.log.append(f"undo {self.name}")
+
+    @property
+    def description(self) -> str:
+        return self.name
+
+
+@pytest.fixture
+def manager():
+    return UndoManager()
+
+
+def test_undo_redo_walks_history(manager):
+    log = []
+    manager.execute_command(RecordingCommand("A", log))
+    manager.execute_command(RecordingCommand("B", log))
+
+    manager.undo()
+    manager.undo()
+    assert not manager.can_undo()
+    assert manager.get_redo_stack_descriptions() == ["A", "B"]
+
+    manager.redo()
+    assert log == ["do A", "do B", "undo B", "undo A", "do A"]
+    assert manager.get_undo_stack_descriptions() == ["A"]
+    assert manager.get_redo_stack_descriptions() == ["B"]
+
+
+def test_execute_after_undo_drops_redo_tail(manager):
+    log = []
+    manager.execute_command(RecordingCommand("A", log))
+    manager.execute_command(RecordingCommand("B", log))
+    manager.undo()
+
+    manager.execute_command(RecordingCommand("C", log))
+
+    assert not manager.can_redo()
+    assert manager.get_undo_stack_descriptions() == ["C", "A"]
+
+
+def test_failed_undo_keeps_command_undoable(manager):
+    log = []
+    manager.execute_command(RecordingCommand("A", log, fail_on_undo=True))
+
+    with pytest.raises(RuntimeError):
+        manager.undo()
+
+    assert manager.can_undo()
+    assert not manager.can_redo()
+
+
+def test_signals_only_emitted_on_change(manager):
+    can_undo_values = []
+    undo_texts = []
+    manager.can_undo_changed.connect(can_undo_values.append)
+    manager.undo_text_changed.connect(undo_texts.append)
+    log = []
+
+    manager.execute_command(RecordingCommand("A", log))
+    manager.execute_command(RecordingCommand("B", log))
+    manager.clear_stacks()
+    manager.clear_stacks()
+
+    assert can_undo_values == [True, False]
+    assert undo_texts == ["Undo A", "Undo B", "Undo"]
+
+    manager._update_signals(force=True)
+    assert can_undo_values == [True, False, False]